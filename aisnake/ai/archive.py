@@ -0,0 +1,175 @@
+import json
+import os
+import numpy as np
+from ..evolpy.quantize import quantize, dequantize
+from .nnet import layer_segments
+
+# File layout of a population archive:
+# - MAGIC
+# - Length of the header in bytes, as little endian uint64
+# - JSON header with generation, layer layout, shape and offsets
+# - Genome matrix of shape (individuums, genome size), float32,
+#   float16 or int8 (see evolpy/quantize.py)
+# - Fitness, float64 of shape (individuums,)
+# - For int8, float32 scales of shape (individuums, layers)
+# Arrays start at multiples of ALIGNMENT, so they can be memory mapped.
+MAGIC = b"AISNKPOP"
+ALIGNMENT = 64
+
+
+class PopulationArchive(object):
+    """
+    Genomes and fitness values of a whole population,
+    stored in a single file.
+    """
+
+    def __init__(
+        self, genomes, fitness, generation, layer_sizes, bias=False, scales=None
+    ):
+        """
+        :genomes: Array of shape (individuums, genome size)
+        :fitness: Array of shape (individuums,)
+        :generation: Number of the generation
+        :layer_sizes: Layer sizes of the nets
+        :bias: Whether the nets use biases
+        :scales: Scales per layer if genomes are int8
+        """
+        self.genomes = genomes
+        self.fitness = fitness
+        self.generation = generation
+        self.layer_sizes = list(layer_sizes)
+        self.bias = bias
+        self.scales = scales
+
+    def __len__(self):
+        return len(self.genomes)
+
+    def float_genomes(self, index=slice(None)):
+        """
+        Genomes at index as float32.
+        """
+        scales = None if self.scales is None else self.scales[index]
+        return dequantize(self.genomes[index], scales, layer_segments(self.layer_sizes))
+
+    def save(self, file_name, dtype="float32"):
+        """
+        Write the archive with one sequential write per array.
+
+        :dtype: Store genomes as "float32", "float16" or "int8"
+        with one scale per layer
+        """
+        genomes, scales = quantize(
+            self.float_genomes(), dtype, layer_segments(self.layer_sizes)
+        )
+        fitness = np.ascontiguousarray(self.fitness, dtype=np.float64)
+        if genomes.ndim != 2 or fitness.shape != (len(genomes),):
+            raise ValueError("Expect genomes (P, G) and fitness (P,)")
+
+        header = {
+            "generation": int(self.generation),
+            "layer_sizes": [int(n) for n in self.layer_sizes],
+            "bias": bool(self.bias),
+            "shape": list(genomes.shape),
+            "dtype": dtype,
+        }
+        # Offsets depend on the header length, which depends on the offsets
+        header["genomes_offset"] = header["fitness_offset"] = 0
+        header["scales_offset"] = 0
+        while True:
+            data = json.dumps(header).encode()
+            offset = _align(len(MAGIC) + 8 + len(data))
+            if offset == header["genomes_offset"]:
+                break
+            header["genomes_offset"] = offset
+            header["fitness_offset"] = _align(offset + genomes.nbytes)
+            header["scales_offset"] = _align(header["fitness_offset"] + fitness.nbytes)
+
+        with open(file_name, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(data).to_bytes(8, "little"))
+            f.write(data)
+            f.write(b"\0" * (header["genomes_offset"] - f.tell()))
+            f.write(genomes.tobytes())
+            f.write(b"\0" * (header["fitness_offset"] - f.tell()))
+            f.write(fitness.tobytes())
+            if scales is not None:
+                f.write(b"\0" * (header["scales_offset"] - f.tell()))
+                f.write(scales.tobytes())
+
+    @classmethod
+    def load(cls, file_name, mmap_mode="r"):
+        """
+        Open an archive. The arrays are memory maps of the file,
+        nothing is read until they are accessed.
+
+        :mmap_mode: "r" for read only, "c" for copy on write,
+        "r+" to write changes back to the file, None to read
+        the arrays into memory
+        """
+        with open(file_name, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError("{} is no population archive".format(file_name))
+            length = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(length).decode())
+
+        n_individuums, size = header["shape"]
+        dtype = header.get("dtype", "float32")
+        parts = [
+            ("genomes_offset", dtype, (n_individuums, size)),
+            ("fitness_offset", np.float64, (n_individuums,)),
+        ]
+        if dtype == "int8":
+            n_layers = len(header["layer_sizes"]) - 1
+            parts.append(("scales_offset", np.float32, (n_individuums, n_layers)))
+        arrays = []
+        for key, dtype, shape in parts:
+            if mmap_mode is None:
+                array = np.fromfile(
+                    file_name,
+                    dtype=dtype,
+                    count=int(np.prod(shape)),
+                    offset=header[key],
+                ).reshape(shape)
+            else:
+                array = np.memmap(
+                    file_name,
+                    dtype=dtype,
+                    mode=mmap_mode,
+                    offset=header[key],
+                    shape=shape,
+                )
+            arrays.append(array)
+        return cls(
+            arrays[0],
+            arrays[1],
+            header["generation"],
+            header["layer_sizes"],
+            header["bias"],
+            arrays[2] if len(arrays) > 2 else None,
+        )
+
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def save_population(archive, file_name="population.pop", dtype="float32"):
+    """
+    Save a PopulationArchive in the model folder.
+
+    :dtype: Store genomes as "float32", "float16" or "int8"
+    """
+    model_folder_path = "./model"
+    if not os.path.exists(model_folder_path):
+        os.makedirs(model_folder_path)
+    archive.save(os.path.join(model_folder_path, file_name), dtype)
+
+
+def load_population(file_name="population.pop", mmap_mode="r"):
+    """
+    Load a PopulationArchive from the model folder.
+    """
+    file_name = os.path.join("./model", file_name)
+    if not os.path.isfile(file_name):
+        raise ValueError("File {} not found".format(file_name))
+    return PopulationArchive.load(file_name, mmap_mode)
@@ -0,0 +1,52 @@
+from collections import OrderedDict
+
+
+class DecisionCache(object):
+    """
+    Bounded LRU cache from packed state keys (see
+    StateEncoder.key()) to the decision of a net.
+
+    A net is a pure function of the state, so a state that was
+    seen before is answered without evaluating the net. The cache
+    belongs to one genome and must be dropped when it changes.
+    """
+
+    def __init__(self, maxsize=4096):
+        """
+        :maxsize: Maximum number of states, the least recently
+        used state is dropped when it is exceeded
+        """
+        if maxsize <= 0:
+            raise ValueError("Expect maxsize to be positive")
+        self.maxsize = maxsize
+        self.table = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.table)
+
+    def get(self, key):
+        """
+        Cached decision for key, or None.
+        """
+        value = self.table.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.table.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """
+        Store the decision for key.
+        """
+        self.table[key] = value
+        if len(self.table) > self.maxsize:
+            self.table.popitem(last=False)
+
+    def clear(self):
+        self.table.clear()
+        self.hits = 0
+        self.misses = 0
@@ -1,85 +1,292 @@
-import torch
-import torch.nn as nn
-
-# import torch.nn.functional as F
+from functools import lru_cache
+import numpy as np
 from copy import deepcopy
-import random
 import os
+from .numpy_net import NumpyNet, PopulationNet, ACTIVATIONS
+from .decision_cache import DecisionCache
 
 
-class NeuralNet4Layer(nn.Module):
+class NeuralNet4Layer(object):
     """
     N-Layer neural network
+
+    All parameters live in one contiguous float32 vector, the
+    genome, in the order [weight1, bias1, weight2, bias2, ...].
+    self.weights and self.biases are views into the genome,
+    weights have shape (out, in) like torch.nn.Linear. Copying,
+    mutating and serializing a net are operations on the genome.
     """
 
-    def __init__(self, layer_sizes: [int], bias=False):
+    def __init__(self, layer_sizes: [int], bias=False, activation=None):
         """
         Initialize with random weights.
 
         :layer_size: Layer sizes, order [input, hidden1, hidden2, output]
         :bias: If False, neglects bias.
+        :activation: Activation of the hidden layers, one of ACTIVATIONS.
+        If None, the net is linear and inference folds it into one layer.
         """
         assert len(layer_sizes) == 4, len(layer_sizes)
-        super().__init__()
+        if activation not in ACTIVATIONS:
+            raise ValueError("Expect activation to be one of {}".format(ACTIVATIONS))
         self.layer_sizes = layer_sizes
         self.depth = len(layer_sizes)
-        self.linear1 = nn.Linear(layer_sizes[0], layer_sizes[1])
-        self.linear2 = nn.Linear(layer_sizes[1], layer_sizes[2])
-        self.linear3 = nn.Linear(layer_sizes[2], layer_sizes[3])
-        self.linear = [self.linear1, self.linear2, self.linear3]
         self.bias = bias
+        self.activation = activation
         # Number of weights per layer
         self.num_weights = [
             self.layer_sizes[i] * self.layer_sizes[i + 1] for i in range(self.depth - 1)
         ]
-        self.apply(self._init_weights)
+        self._set_genome(np.empty(genome_size(layer_sizes), dtype=np.float32))
+        self._init_weights()
+
+    def __getstate__(self):
+        return {
+            "layer_sizes": self.layer_sizes,
+            "bias": self.bias,
+            "activation": self.activation,
+            "genome": self.genome,
+        }
+
+    def __setstate__(self, state):
+        self.layer_sizes = state["layer_sizes"]
+        self.depth = len(self.layer_sizes)
+        self.bias = state["bias"]
+        self.activation = state.get("activation")
+        self.num_weights = [
+            self.layer_sizes[i] * self.layer_sizes[i + 1] for i in range(self.depth - 1)
+        ]
+        self._set_genome(state["genome"])
+
+    def _set_genome(self, genome):
+        """
+        Use genome as parameter vector and create the layer views.
+        """
+        self.genome = genome
+        self.weights, self.biases = [], []
+        start = 0
+        for n_in, n_out in zip(self.layer_sizes[:-1], self.layer_sizes[1:]):
+            self.weights.append(
+                genome[start : start + n_in * n_out].reshape(n_out, n_in)
+            )
+            start += n_in * n_out
+            self.biases.append(genome[start : start + n_out])
+            start += n_out
+        self._numpy_net = None
+        self._torch_net = None
+        self._decision_cache = None
+
+    @classmethod
+    def from_genome(cls, layer_sizes, genome, bias=False, activation=None):
+        """
+        Create a net that uses genome as its parameter vector,
+        without copying it.
+
+        :genome: float32 array of size genome_size(layer_sizes)
+        """
+        if genome.shape != (genome_size(layer_sizes),):
+            raise ValueError(
+                "Expect genome of size {}".format(genome_size(layer_sizes))
+            )
+        net = cls.__new__(cls)
+        net.__setstate__(
+            {
+                "layer_sizes": layer_sizes,
+                "bias": bias,
+                "activation": activation,
+                "genome": genome,
+            }
+        )
+        return net
+
+    def copy(self):
+        """
+        Return an independent copy of the net.
+        """
+        return deepcopy(self)
 
     def forward(self, x):
         """
         Evaluate Neural net
 
-        :x: Input state in torch Tensor format
-        :return: Neural net output in Tensor format
+        :x: Input state as float32 array
+        :return: Neural net output, overwritten by the next call
 
         Example
         >>>
-        net = NeuralNetN([11, 4, 3])
-        state = [0] * 11
-        state = torch.tensor(state, dtype=torch.float)
+        net = NeuralNet4Layer([11, 4, 4, 3])
+        state = np.zeros(11, dtype=np.float32)
         x = net.forward(state)
         >>>
         """
-        for l in self.linear:
-            # x = F.relu(l(x))
-            x = l(x)
-        return x
+        return self.numpy_net().forward(x)
+
+    def numpy_net(self):
+        """
+        Return a NumpyNet with the current weights, for inference
+        without torch.
+
+        The NumpyNet is cached and rebuilt only after the weights
+        have changed by mutate(), recombination or load(). Nets
+        without activation are folded into a single layer.
+        """
+        if self._numpy_net is None:
+            self._numpy_net = NumpyNet(
+                self.weights, self.biases if self.bias else None, self.activation
+            )
+        return self._numpy_net
+
+    def decision_cache(self, maxsize=4096):
+        """
+        Return the DecisionCache of this net, created on first use.
+        It is dropped with the other cached inference data.
+        """
+        if self._decision_cache is None:
+            self._decision_cache = DecisionCache(maxsize)
+        return self._decision_cache
+
+    def to_torch(self):
+        """
+        Return the net as torch.nn.Sequential of nn.Linear layers,
+        with the same state_dict layout as saved by save().
+
+        The module is cached like numpy_net().
+        """
+        if self._torch_net is None:
+            import torch
+            import torch.nn as nn
+
+            layers = [
+                nn.Linear(n_in, n_out)
+                for n_in, n_out in zip(self.layer_sizes[:-1], self.layer_sizes[1:])
+            ]
+            with torch.no_grad():
+                for layer, w, b in zip(layers, self.weights, self.biases):
+                    layer.weight.copy_(torch.from_numpy(w))
+                    layer.bias.copy_(torch.from_numpy(b))
+            if self.activation == "relu":
+                layers = [
+                    module for layer in layers[:-1] for module in (layer, nn.ReLU())
+                ] + layers[-1:]
+            self._torch_net = nn.Sequential(*layers)
+        return self._torch_net
+
+    def weights_changed(self):
+        """
+        Drop cached inference data, must be called after
+        the weights have been changed in place.
+        """
+        self._numpy_net = None
+        self._torch_net = None
+        self._decision_cache = None
+
+    def state_dict(self):
+        """
+        Parameters by name, in the layout of the former
+        torch module (linear1.weight, linear1.bias, ...).
+        """
+        state = {}
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            state["linear{}.weight".format(i + 1)] = w
+            state["linear{}.bias".format(i + 1)] = b
+        return state
 
     def save(self, file_name="model.pth"):
+        import torch
+
         model_folder_path = "./model"
         if not os.path.exists(model_folder_path):
             os.makedirs(model_folder_path)
 
         file_name = os.path.join(model_folder_path, file_name)
-        torch.save(self.state_dict(), file_name)
+        state = {
+            key: torch.from_numpy(value.copy())
+            for key, value in self.state_dict().items()
+        }
+        torch.save(state, file_name)
 
     def load(self, file_name="model.pth"):
+        import torch
+
         model_folder_path = "./model"
         file_name = os.path.join(model_folder_path, file_name)
         if not os.path.isfile(file_name):
             raise ValueError("File {} not found".format(file_name))
-        self.load_state_dict(torch.load(file_name))
-
-    def _init_weights(self, module):
+        state = torch.load(file_name)
+        for key, value in self.state_dict().items():
+            if key not in state:
+                raise ValueError("Missing {} in file {}".format(key, file_name))
+            value[...] = state[key].detach().numpy()
+        self.weights_changed()
+
+    def _init_weights(self):
         """
         Initialize weights with random numbers
         between -1 and 1
         """
-        if isinstance(module, nn.Linear):
-            module.weight.data.uniform_(-1.0, 1.0)
-            if module.bias is not None and not self.bias:
-                module.bias.data.zero_()
-            else:
-                module.bias.data.uniform_(-1.0, 1.0)
+        self.genome[:] = random_genomes(1, self.layer_sizes, self.bias)[0]
+
+
+def genome_size(layer_sizes):
+    """
+    Number of weights and biases of a net with layer_sizes.
+    """
+    return sum(
+        n_in * n_out + n_out for n_in, n_out in zip(layer_sizes[:-1], layer_sizes[1:])
+    )
+
+
+def random_genomes(n, layer_sizes, bias=False, rng=None):
+    """
+    Genomes with random weights between -1 and 1, and
+    random biases if bias, zero biases otherwise.
+
+    :rng: numpy Generator, if None the global numpy random state is used
+    :return: float32 array of shape (n, genome size)
+    """
+    rng = np.random if rng is None else rng
+    genomes = rng.uniform(-1.0, 1.0, (n, genome_size(layer_sizes)))
+    genomes = genomes.astype(np.float32)
+    if not bias:
+        genomes[:, gene_layout(tuple(layer_sizes))[2]] = 0.0
+    return genomes
+
+
+def population_net(genomes, layer_sizes, scales=None, activation=None):
+    """
+    PopulationNet of a batch of genomes, without building a net per genome.
+
+    :genomes: Array of shape (P, genome size), float32, float16, or
+    int8 with scales
+    :scales: For int8 genomes, array of shape (P, number of layers)
+    with one scale per layer (see layer_segments()), applied to the
+    layer outputs
+    :activation: Activation of the nets, see NeuralNet4Layer
+    """
+    weights, biases = [], []
+    start = 0
+    for n_in, n_out in zip(layer_sizes[:-1], layer_sizes[1:]):
+        weights.append(
+            genomes[:, start : start + n_in * n_out].reshape(-1, n_out, n_in)
+        )
+        start += n_in * n_out
+        biases.append(genomes[:, start : start + n_out])
+        start += n_out
+    if scales is not None:
+        scales = [scales[:, i] for i in range(len(weights))]
+    return PopulationNet.from_layers(weights, biases, scales, activation)
+
+
+def layer_segments(layer_sizes):
+    """
+    Range (start, stop) of the weights and biases of each layer in the genome.
+    """
+    segments = []
+    start = 0
+    for n_in, n_out in zip(layer_sizes[:-1], layer_sizes[1:]):
+        segments.append((start, start + n_in * n_out + n_out))
+        start += n_in * n_out + n_out
+    return segments
 
 
 class EvolvingNeuralNet(NeuralNet4Layer):
@@ -88,10 +295,10 @@ class EvolvingNeuralNet(NeuralNet4Layer):
     evoluationary methods.
     """
 
-    def __init__(self, layer_sizes: [int], bias=False):
-        super().__init__(layer_sizes, bias)
+    def __init__(self, layer_sizes: [int], bias=False, activation=None):
+        super().__init__(layer_sizes, bias, activation)
 
-    def recombine(self, other):
+    def recombine(self, other, rng=None):
         """
         Recombine two neural nets and produce
         two new offsprings.
@@ -101,87 +308,197 @@ class EvolvingNeuralNet(NeuralNet4Layer):
         right is seen as seperate chromosome.
 
         :other: Mating partner of type Neuralnet
+        :rng: numpy Generator, if None the global numpy random state is used
 
         :return: Two offsprings (NeuralNet, NeuralNet)
         """
-        return recombine_weights(self, other, bias=self.bias)
-
-    def mutate(self, N, N_biases=2):
-        from .utils import convert_index_1d_to_2d
-
-        # Total number of weights
-        total_num_weights = 0
-        for i in range(len(self.layer_sizes) - 1):
-            total_num_weights += self.layer_sizes[i] * self.layer_sizes[i + 1]
-
-        for _ in range(N):
-            i_gene = random.randint(0, total_num_weights - 1)
-
-            # # Check if gene is within scope
-            # if i_gene >= total_num_weights:
-            #     raise IndexError(
-            #         "index {} of gene out of Nnet size {}".format(i_gene, total_num_weights)
-            #     )
-
-            # Figure out at which plane of the nnet the gene lays
-            depth = 0
-            while (
-                i_gene // (self.layer_sizes[depth] * self.layer_sizes[depth + 1])
-            ) > 0:
-                i_gene -= self.layer_sizes[depth] * self.layer_sizes[depth + 1]
-                depth += 1
-            max_row, max_col = self.linear[depth].weight.shape
-            (row, col) = convert_index_1d_to_2d(i_gene, max_row, max_col)
-            self.linear[depth].weight.data[row, col] = random.uniform(-1, 1)
-
-        # Mutate biases
-        if self.bias:
-            total_num_biases = 0
-            for i in range(len(self.layer_sizes) - 1):
-                total_num_biases += self.layer_sizes[i + 1]
-            for _ in range(N_biases):
-                i_gene = random.randint(0, total_num_biases - 1)
-                # Figure out at which plane of the nnet the gene lays
-                depth = 0
-                while (i_gene // self.layer_sizes[depth + 1]) > 0:
-                    i_gene -= self.layer_sizes[depth + 1]
-                    depth += 1
-                self.linear[depth].bias.data[i_gene] = random.uniform(-1, 1)
-
-    # def mutate(self, N):
-    #     """
-    #     Mutate N randomly picked weights.
-
-    #     TODO: N unique mutations. Currently one gene might be mutated
-    #     more than once.
-
-    #     :N: Number of weights to mutate.
-    #     """
-    #     total_weights = 0
-    #     for i in range(self.depth - 1):
-    #         total_weights += self.num_weights[i]
-    #     genes = [random.randint(0, total_weights - 1) for _ in range(N)]
-    #     for gene in genes:
-    #         n, i, j = self._pos_in_layer(gene)
-    #         self.linear[n].weight.data[i, j] = random.uniform(-1, 1)
-
-    # def _pos_in_layer(self, n: int):
-    #     """
-    #     Given the absolute position n (< total size of Nnet), find
-    #     the position where it belongs
-    #     """
-    #     i, p, w = 0, 0, self.num_weights[0]
-    #     while i < self.depth - 1:
-    #         if n < w:
-    #             return i, (n - p) // self.layer_sizes[i], (n - p) % self.layer_sizes[i]
-    #         else:
-    #             i += 1
-    #             p += self.num_weights[i - 1]
-    #             w += self.num_weights[i]
-    #     raise ValueError("N {:6} outside Neural net scope.".format(n))
-
-
-def recombine_outgoing(net_a, net_b):
+        return recombine_weights(self, other, bias=self.bias, rng=rng)
+
+    def mutate(self, N, N_biases=2, mode="uniform", sigma=0.1, rng=None):
+        """
+        Mutate N unique weights, and N_biases unique biases if
+        the net uses biases. See mutate_genomes().
+        """
+        mutate_genomes(
+            self.genome[None, :],
+            self.layer_sizes,
+            N,
+            N_biases if self.bias else 0,
+            mode=mode,
+            sigma=sigma,
+            rng=rng,
+        )
+        self.weights_changed()
+
+
+# Mutation modes of mutate_genomes()
+MUTATION_MODES = ("uniform", "gaussian")
+
+
+@lru_cache(maxsize=None)
+def gene_layout(layer_sizes):
+    """
+    Position of the weights and biases in the genome of a net.
+
+    :layer_sizes: Tuple of layer sizes
+    :return: (weight_index, weight_layer, bias_index, bias_layer), the
+    genome index and the layer of every weight and of every bias
+    """
+    weight_index, weight_layer, bias_index, bias_layer = [], [], [], []
+    start = 0
+    for layer, (n_in, n_out) in enumerate(zip(layer_sizes[:-1], layer_sizes[1:])):
+        weight_index.append(np.arange(start, start + n_in * n_out))
+        weight_layer.append(np.full(n_in * n_out, layer))
+        start += n_in * n_out
+        bias_index.append(np.arange(start, start + n_out))
+        bias_layer.append(np.full(n_out, layer))
+        start += n_out
+    layout = tuple(
+        np.concatenate(a) for a in (weight_index, weight_layer, bias_index, bias_layer)
+    )
+    for a in layout:
+        a.setflags(write=False)
+    return layout
+
+
+def mutate_genomes(
+    genomes, layer_sizes, n_weights, n_biases=0, mode="uniform", sigma=0.1, rng=None
+):
+    """
+    Mutate a batch of genomes in place.
+
+    Every genome gets n_weights unique weights and n_biases unique
+    biases mutated. The indices of all genomes are drawn at once
+    and the new values are written with a single fancy-index
+    assignment.
+
+    :genomes: float32 array of shape (number of genomes, genome size)
+    :layer_sizes: Layer sizes of the nets
+    :n_weights: Number of weights to mutate per genome
+    :n_biases: Number of biases to mutate per genome
+    :mode: "uniform" resets genes to a random value in [-1, 1],
+    "gaussian" adds normal noise with standard deviation sigma.
+    Either one mode, or a sequence with one mode per layer.
+    :sigma: Standard deviation of the gaussian mode, one value or
+    a sequence with one value per layer
+    :rng: numpy Generator, if None the global numpy random state is used
+    """
+    rng = np.random if rng is None else rng
+    depth = len(layer_sizes) - 1
+    modes = [mode] * depth if isinstance(mode, str) else list(mode)
+    if len(modes) != depth or any(m not in MUTATION_MODES for m in modes):
+        raise ValueError(
+            "Expect mode to be one of {} or one per layer".format(MUTATION_MODES)
+        )
+    gaussian = np.array([m == "gaussian" for m in modes])
+    sigma = np.broadcast_to(np.asarray(sigma, dtype=np.float32), (depth,))
+
+    weight_index, weight_layer, bias_index, bias_layer = gene_layout(tuple(layer_sizes))
+    rows = np.arange(len(genomes))[:, None]
+    for n, index, layer in (
+        (n_weights, weight_index, weight_layer),
+        (n_biases, bias_index, bias_layer),
+    ):
+        if n <= 0:
+            continue
+        if n > len(index):
+            raise ValueError("Cannot mutate {} of {} genes".format(n, len(index)))
+        # n unique genes per genome
+        picked = np.argpartition(rng.random((len(genomes), len(index))), n - 1)[:, :n]
+        cols, layers = index[picked], layer[picked]
+        values = rng.uniform(-1.0, 1.0, picked.shape).astype(np.float32)
+        is_gaussian = gaussian[layers]
+        if is_gaussian.any():
+            noise = rng.normal(0.0, 1.0, picked.shape) * sigma[layers]
+            values = np.where(is_gaussian, genomes[rows, cols] + noise, values)
+        genomes[rows, cols] = values
+
+
+# Crossover kinds of crossover_genomes()
+CROSSOVER_KINDS = ("uniform", "ingoing", "outgoing")
+
+
+def crossover_mask(n_pairs, layer_sizes, kind="uniform", bias=False, rng=None):
+    """
+    Boolean mask over the genome of each pair, True where the
+    first offspring inherits from the second parent.
+
+    - uniform: Every weight (and bias if bias) is drawn independently
+    - ingoing: Every node on the RIGHT of a layer gets a crossover
+      point in [1, len(incoming) - 2], incoming weights from that
+      point on are inherited
+    - outgoing: Every node on the LEFT of a layer gets a crossover
+      point in [1, len(outgoing) - 2], outgoing weights from that
+      point on are inherited
+
+    :return: Boolean array of shape (n_pairs, genome size)
+    """
+    if kind not in CROSSOVER_KINDS:
+        raise ValueError("Expect kind to be one of {}".format(CROSSOVER_KINDS))
+    rng = np.random if rng is None else rng
+    masks = []
+    for n_in, n_out in zip(layer_sizes[:-1], layer_sizes[1:]):
+        if kind == "uniform":
+            weights = rng.random((n_pairs, n_out, n_in)) < 0.5
+        elif kind == "ingoing":
+            pt = random_points(rng, n_in, (n_pairs, n_out, 1))
+            weights = np.arange(n_in) >= pt
+        else:
+            pt = random_points(rng, n_out, (n_pairs, 1, n_in))
+            weights = np.arange(n_out)[:, None] >= pt
+        masks.append(weights.reshape(n_pairs, -1))
+        if kind == "uniform" and bias:
+            masks.append(rng.random((n_pairs, n_out)) < 0.5)
+        else:
+            masks.append(np.zeros((n_pairs, n_out), dtype=bool))
+    return np.concatenate(masks, axis=1)
+
+
+def random_points(rng, num_genes, shape):
+    """
+    Random crossover points in [1, num_genes - 2].
+    """
+    if num_genes < 3:
+        raise ValueError("Need at least 3 genes for a crossover point")
+    return 1 + (rng.random(shape) * (num_genes - 2)).astype(np.int64)
+
+
+def crossover_genomes(
+    genomes_a, genomes_b, layer_sizes, kind="uniform", bias=False, rng=None
+):
+    """
+    Recombine pairs of genomes, row i of genomes_a with row i
+    of genomes_b. Every pair produces two complementary offsprings.
+
+    :genomes_a: float32 array of shape (number of pairs, genome size)
+    :genomes_b: float32 array of the same shape
+    :kind: One of CROSSOVER_KINDS, see crossover_mask()
+    :bias: If true, also recombine bias values (uniform only)
+    :rng: numpy Generator, if None the global numpy random state is used
+    :return: Offsprings (genomes, genomes), arrays like genomes_a
+    """
+    mask = crossover_mask(len(genomes_a), layer_sizes, kind, bias, rng)
+    return np.where(mask, genomes_b, genomes_a), np.where(mask, genomes_a, genomes_b)
+
+
+def _recombine(net_a, net_b, kind, bias=False, rng=None):
+    genome_a, genome_b = crossover_genomes(
+        net_a.genome[None, :],
+        net_b.genome[None, :],
+        net_a.layer_sizes,
+        kind,
+        bias,
+        rng,
+    )
+    return [
+        type(net_a).from_genome(
+            net_a.layer_sizes, genome[0], net_a.bias, net_a.activation
+        )
+        for genome in (genome_a, genome_b)
+    ]
+
+
+def recombine_outgoing(net_a, net_b, rng=None):
     """
     Recombine outgoing weights.
 
@@ -195,29 +512,10 @@ def recombine_outgoing(net_a, net_b):
     :net_b: Neural network B
     :return: 2 offspings of type [Neuralnetwork; 2]
     """
-    # # Check input
-    # if not isinstance(net_a, NeuralNet) or not isinstance(net_b, NeuralNet):
-    #     raise ValueError("Wrong input.")
-
-    # Initiate Offsprings
-    off_a = deepcopy(net_a)
-    off_b = deepcopy(net_a)
-
-    # Recombine
-    with torch.no_grad():
-        for n in range(net_a.depth - 1):
-            num_genes = net_a.layer_sizes[n + 1]
-
-            # Consider multiple individual chromosomes
-            for i in range(net_a.layer_sizes[n]):
-                pt = random.randint(1, num_genes - 2)
-                off_a.linear[n].weight[pt:, i] = net_b.linear[n].weight[pt:, i]
-                off_b.linear[n].weight[:pt, i] = net_b.linear[n].weight[:pt, i]
-
-    return [off_a, off_b]
+    return _recombine(net_a, net_b, "outgoing", rng=rng)
 
 
-def recombine_ingoing(net_a, net_b):
+def recombine_ingoing(net_a, net_b, rng=None):
     """
     Recombine ingoing weights.
 
@@ -231,29 +529,10 @@ def recombine_ingoing(net_a, net_b):
     :net_b: Neural network B
     :return: 2 offspings of type [Neuralnetwork; 2]
     """
-    # # Check input
-    # if not isinstance(net_a, NeuralNet) or not isinstance(net_b, NeuralNet):
-    #     raise ValueError("Wrong input.")
-
-    # Initiate Offsprings
-    off_a = deepcopy(net_a)
-    off_b = deepcopy(net_a)
-
-    # Recombine
-    with torch.no_grad():
-        for n in range(net_a.depth - 1):
-            num_genes = net_a.layer_sizes[n]
-
-            # Consider multiple individual chromosomes
-            for i in range(net_a.layer_sizes[n + 1]):
-                pt = random.randint(1, num_genes - 2)
-                off_a.linear[n].weight[i, pt:] = net_b.linear[n].weight[i, pt:]
-                off_b.linear[n].weight[i, :pt] = net_b.linear[n].weight[i, :pt]
-
-    return [off_a, off_b]
+    return _recombine(net_a, net_b, "ingoing", rng=rng)
 
 
-def recombine_weights(net_a, net_b, bias=False):
+def recombine_weights(net_a, net_b, bias=False, rng=None):
     """
     Recombine weights randomly.
 
@@ -264,32 +543,7 @@ def recombine_weights(net_a, net_b, bias=False):
     :net_a: Neural network A
     :net_b: Neural network B
     :bias: If true, also reombine bias values
+    :rng: numpy Generator, if None the global numpy random state is used
     :return: 2 offspings of type [Neuralnetwork; 2]
     """
-    # # Check input
-    # if not isinstance(net_a, NeuralNet) or not isinstance(net_b, NeuralNet):
-    #     raise ValueError("Wrong input.")
-
-    # Initiate Offsprings
-    off_a = deepcopy(net_a)
-    off_b = deepcopy(net_a)
-
-    # Recombine
-    with torch.no_grad():
-        for n in range(net_a.depth - 1):
-            for i in range(net_a.layer_sizes[n]):
-                for j in range(net_a.layer_sizes[n + 1]):
-                    pt = random.randint(0, 1)
-                    if pt == 0:
-                        off_b.linear[n].weight[j, i] = net_b.linear[n].weight[j, i]
-                    else:
-                        off_a.linear[n].weight[j, i] = net_b.linear[n].weight[j, i]
-
-                if bias:
-                    for i in range(net_a.layer_sizes[n + 1]):
-                        pt = random.randint(0, 1)
-                        if pt == 0:
-                            off_b.linear[n].bias[i] = net_b.linear[n].bias[i]
-                        else:
-                            off_a.linear[n].bias[i] = net_b.linear[n].bias[i]
-    return [off_a, off_b]
+    return _recombine(net_a, net_b, "uniform", bias, rng)
@@ -0,0 +1,219 @@
+import numpy as np
+
+# Activation between the layers of a net, None for a purely linear net
+ACTIVATIONS = (None, "relu")
+
+
+class NumpyNet(object):
+    """
+    Inference of a stack of linear layers with NumPy.
+
+    Used to evaluate small nets step by step, where the overhead
+    of torch outweighs the math. The weights are copied into
+    contiguous float32 arrays once, and every layer writes into
+    its own preallocated output buffer.
+
+    Without activation the stack is one affine map, and it is
+    folded into a single layer (see fold_layers()).
+    """
+
+    def __init__(self, weights, biases=None, activation=None, fold=True):
+        """
+        :weights: List of weight matrices of shape (out, in)
+        :biases: List of bias vectors of shape (out,), or None
+        :activation: One of ACTIVATIONS, applied after every layer
+        but the last
+        :fold: Fold the layers of a net without activation into one
+        """
+        if activation not in ACTIVATIONS:
+            raise ValueError("Expect activation to be one of {}".format(ACTIVATIONS))
+        self.activation = activation
+        if activation is None and fold and len(weights) > 1:
+            weight, bias = fold_layers(weights, biases)
+            weights, biases = [weight], [bias]
+        self.weights = [np.ascontiguousarray(w, dtype=np.float32) for w in weights]
+        if biases is None:
+            self.biases = [None] * len(self.weights)
+        else:
+            self.biases = [
+                None if b is None else np.ascontiguousarray(b, dtype=np.float32)
+                for b in biases
+            ]
+        self.buffers = [np.empty(w.shape[0], dtype=np.float32) for w in self.weights]
+
+    def forward(self, x):
+        """
+        Evaluate net.
+
+        :x: float32 array of shape (in,)
+        :return: Output buffer of the last layer, overwritten by the next call
+        """
+        hidden = len(self.weights) - 1
+        for i, (w, b, out) in enumerate(zip(self.weights, self.biases, self.buffers)):
+            np.dot(w, x, out=out)
+            if b is not None:
+                out += b
+            if i < hidden and self.activation == "relu":
+                np.maximum(out, 0.0, out=out)
+            x = out
+        return x
+
+    def act(self, x):
+        """
+        Index of the largest output.
+
+        :x: float32 array of shape (in,)
+        """
+        return int(self.forward(x).argmax())
+
+
+class PopulationNet(object):
+    """
+    Inference of a whole population of nets with the same layer
+    sizes at once.
+
+    The weights of all P nets are stacked into arrays of shape
+    (P, in, out) per layer, so every layer of every net is
+    evaluated with one batched matmul.
+    """
+
+    def __init__(self, nets):
+        """
+        :nets: List of NumpyNet with equal layer sizes and activation
+        """
+        depth = len(nets[0].weights)
+        self.activation = nets[0].activation
+        self._set_layers(
+            [np.stack([net.weights[i] for net in nets]) for i in range(depth)],
+            [
+                np.stack(
+                    [
+                        (
+                            np.zeros(net.weights[i].shape[0], dtype=np.float32)
+                            if net.biases[i] is None
+                            else net.biases[i]
+                        )
+                        for net in nets
+                    ]
+                )
+                for i in range(depth)
+            ],
+        )
+
+    @classmethod
+    def from_layers(cls, weights, biases, scales=None, activation=None, fold=True):
+        """
+        :weights: List of stacked weight matrices of shape (P, out, in)
+        :biases: List of stacked bias vectors of shape (P, out)
+        :scales: List of scales of shape (P,), one list entry per layer.
+        For quantized weights, the output of a layer is
+        (x @ weights + biases) * scales, so the genomes need not be
+        dequantized first. None if the weights are not scaled.
+        Weights of any dtype are converted to float32 once, NumPy has
+        no fast int8 or float16 matmul, so quantization saves memory
+        and disk, not inference time.
+        :activation: One of ACTIVATIONS
+        :fold: Fold the layers of nets without activation into one
+        """
+        if activation not in ACTIVATIONS:
+            raise ValueError("Expect activation to be one of {}".format(ACTIVATIONS))
+        obj = cls.__new__(cls)
+        obj.activation = activation
+        if activation is None and fold and len(weights) > 1:
+            weight, bias = fold_layers(weights, biases, scales)
+            weights, biases, scales = [weight], [bias], None
+        obj._set_layers(weights, biases, scales)
+        return obj
+
+    def _set_layers(self, weights, biases, scales=None):
+        self.n_nets = len(weights[0])
+        # Stored transposed, so that states (P, B, in) @ weights (P, in, out)
+        self.weights = [
+            np.ascontiguousarray(w.transpose(0, 2, 1), dtype=np.float32)
+            for w in weights
+        ]
+        self.biases = [
+            (
+                np.zeros((self.n_nets, 1, w.shape[2]), dtype=np.float32)
+                if b is None
+                else np.asarray(b, dtype=np.float32)[:, None, :]
+            )
+            for w, b in zip(self.weights, biases)
+        ]
+        if scales is None:
+            self.scales = [None] * len(self.weights)
+        else:
+            self.scales = [
+                np.asarray(s, dtype=np.float32)[:, None, None] for s in scales
+            ]
+        self.buffers = {}
+
+    def forward(self, x):
+        """
+        Evaluate all nets.
+
+        :x: float32 array of shape (P, B, in), B states per net
+        :return: Output of shape (P, B, out), overwritten by the next call
+        """
+        buffers = self.buffers.get(x.shape[1])
+        if buffers is None:
+            buffers = [
+                np.empty((w.shape[0], x.shape[1], w.shape[2]), dtype=np.float32)
+                for w in self.weights
+            ]
+            self.buffers[x.shape[1]] = buffers
+        hidden = len(self.weights) - 1
+        layers = zip(self.weights, self.biases, self.scales, buffers)
+        for i, (w, b, s, out) in enumerate(layers):
+            np.matmul(x, w, out=out)
+            out += b
+            if s is not None:
+                out *= s
+            if i < hidden and self.activation == "relu":
+                np.maximum(out, 0.0, out=out)
+            x = out
+        return x
+
+    def act(self, x):
+        """
+        Index of the largest output of each net for each state.
+
+        :x: float32 array of shape (P, B, in)
+        :return: Integer array of shape (P, B)
+        """
+        return self.forward(x).argmax(axis=-1)
+
+
+def fold_layers(weights, biases=None, scales=None):
+    """
+    Fold a stack of linear layers without activation into a
+    single layer, W = W3 @ W2 @ W1 and b = W3 @ (W2 @ b1 + b2) + b3.
+    The product is computed in float64.
+
+    Works on the layers of one net, weights of shape (out, in), and
+    on stacked layers of many nets, weights of shape (P, out, in).
+
+    :biases: List of biases, or of None, or None
+    :scales: List of scales that multiply each layer, see
+    PopulationNet.from_layers(), or None
+    :return: (weight, bias), bias is None if no layer has a bias
+    """
+    weight, bias = None, None
+    for i, w in enumerate(weights):
+        w = np.asarray(w, dtype=np.float64)
+        b = None if biases is None or biases[i] is None else biases[i]
+        b = None if b is None else np.asarray(b, dtype=np.float64)
+        if scales is not None and scales[i] is not None:
+            s = np.asarray(scales[i], dtype=np.float64)
+            w = w * s[..., None, None]
+            b = None if b is None else b * s[..., None]
+        if weight is None:
+            weight, bias = w, b
+            continue
+        weight = np.matmul(w, weight)
+        if bias is not None:
+            bias = np.matmul(w, bias[..., None])[..., 0]
+        if b is not None:
+            bias = b if bias is None else bias + b
+    weight = weight.astype(np.float32)
+    return weight, None if bias is None else bias.astype(np.float32)
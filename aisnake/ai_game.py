@@ -1,32 +1,73 @@
-import pygame
 import time
+import random
 from .snake.camera import Camera
 from .snake.game import Game
-from .snake.datatypes import Turn, perimeter
-from .snake.snake import transform_bord_to_snake
+from .snake.datatypes import perimeter
+from .ai_state import StateEncoder, ACTIONS
 from .ai_snake import AISnake
 from .snake.food import Food
 
+# Backends to evaluate the neural net in ai_action
+INFERENCE = ("numpy", "torch")
+
+# States whose decision is cached per net, 0 disables the cache.
+# Off by default, for the folded default net a lookup is not
+# faster than the net itself.
+DECISION_CACHE_SIZE = 0
+
 
 class AIGame(Game):
     """
     Let game play itself without GUI
+
+    Plays a single game step by step, e.g. to watch a snake.
+    Fitness is computed with BatchGame instead (see
+    AISnake.get_fitness()), which follows the same rules but
+    draws other food spawns for the same seed.
     """
 
-    def __init__(self, snake: AISnake):
+    def __init__(
+        self,
+        snake: AISnake,
+        backend=None,
+        seed=None,
+        inference="numpy",
+        cache_size=DECISION_CACHE_SIZE,
+    ):
+        """
+        :snake: AISnake that plays the game
+        :backend: If given, move the snake to this storage backend,
+        e.g. "bitboard" (see snake.BACKENDS)
+        :seed: Seed of the random generator owned by this game,
+        if None, the global random module is used
+        :inference: Evaluate the neural net with "numpy" or "torch"
+        :cache_size: Size of the decision cache of the net for the
+        numpy inference (see ai/decision_cache.py), 0 to disable it
+        """
         # super().__init__()
         assert isinstance(snake, AISnake)
+        if inference not in INFERENCE:
+            raise ValueError("Expect inference to be one of {}".format(INFERENCE))
+        self.inference = inference
+        self.cache_size = cache_size
+        if backend is not None:
+            snake.set_backend(backend)
         self.camera = Camera(pixel_offsets=[3, 3, 3, 3])
         self.snake = snake
-        self.food = Food()
+        self.food = Food(rng=None if seed is None else random.Random(seed))
         self.food.spawn(self.snake)
         self.display = None
         self.score = 0
+        self.encoder = StateEncoder(snake.vision_radius)
 
-    def reset(self):
+    def reset(self, seed=None):
         """
         Reset snake and food
+
+        :seed: If given, reseed the random generator of this game
         """
+        if seed is not None:
+            self.food.rng = random.Random(seed)
         self.snake.reset()
         self.food.spawn(self.snake)
         self.score = 0
@@ -39,6 +80,8 @@ class AIGame(Game):
         :save_game: Save rendered game as sequence of screenshots
         """
         if visible:
+            import pygame
+
             pygame.init()
             self.display = pygame.display.set_mode(
                 (self.camera.total_width(), self.camera.total_height())
@@ -78,8 +121,8 @@ class AIGame(Game):
             else:
                 self.snake.hunger -= 1
 
-            # Check collision and hunger
-            game_over = any([self.collision(), self.snake.hunger == 0])
+            # Check collision, hunger and whether the bord is filled
+            game_over = any([self.collision(), self.snake.hunger == 0, self.won()])
 
             if visible:
                 clock.tick(10)  # FPS
@@ -99,45 +142,37 @@ class AIGame(Game):
         """
         Return state of the game that is fed into the AI model.
 
+        The state is a float32 array owned by self.encoder, it
+        is overwritten by the next call.
         """
-        state = []
-
-        for i in range(self.snake.vision_radius):
-            for pos in perimeter(self.snake.head(), self.snake.direction, i + 1):
-                state.append(self.collision_at(pos))
-
-        # Food state [ahead, right, behind, left]
-        dist = transform_bord_to_snake(self.food.pos, self.snake)
-        state.append(dist.y > 0)
-        state.append(dist.x > 0)
-        state.append(dist.y < 0)
-        state.append(dist.x < 0)
-
-        return state
+        return self.encoder.encode(self.snake, self.food)
 
     def ai_action(self, model):
         """
         Get turn from ai model
         """
-        import torch
-
         state = self.get_state()
-        state = torch.tensor(state, dtype=torch.float)
-        x = model.forward(state)
-        values = list(x.detach().numpy())
-        maxindex = values.index(max(values))
-        if maxindex == 0:
-            return Turn.NO
-        elif maxindex == 1:
-            return Turn.RIGHT
-        elif maxindex == 2:
-            return Turn.LEFT
+        if self.inference == "numpy" and self.cache_size > 0:
+            cache = model.decision_cache(self.cache_size)
+            key = self.encoder.key()
+            turn = cache.get(key)
+            if turn is None:
+                turn = ACTIONS[model.numpy_net().act(state)]
+                cache.put(key, turn)
+            return turn
+        if self.inference == "numpy":
+            maxindex = model.numpy_net().act(state)
         else:
+            x = model.to_torch()(self.encoder.tensor())
+            values = list(x.detach().numpy())
+            maxindex = values.index(max(values))
+        if maxindex >= len(ACTIONS):
             raise ValueError("maxindex outside of limits")
+        return ACTIONS[maxindex]
 
     def render(self):
         import pygame
-        from .snake.game import render_field, render_snake, render_food, render_score
+        from .snake.render import render_field, render_snake, render_food, render_score
         from .snake.params import COL_BORDER
 
         self.display.fill(COL_BORDER)
@@ -150,24 +185,17 @@ class AIGame(Game):
         pygame.display.update()
 
     def render_state(self):
+        from .snake.render import render_pixel_alpha
+
         green = (203, 255, 203)
         red = (255, 203, 203)
         assert isinstance(self.snake, AISnake)
-        for i in range(self.snake.vision_radius):
-            for pos in perimeter(self.snake.head(), self.snake.direction, i + 1):
-                color = red if self.collision_at(pos) else green
-                render_pixel_alpha(pos, self.display, self.camera, color)
-
-
-def render_pixel_alpha(pos, display, camera, color, scale=0.9):
-    s = camera.size_pixel * scale
-    pos_world = camera.bord_to_world(pos)
-    rect = [pos_world.x, pos_world.y, s, s]
-    draw_rect_alpha(display, color, rect)
-    # pygame.draw.rect(display, color, rect)
-
-
-def draw_rect_alpha(surface, color, rect):
-    shape_surf = pygame.Surface(pygame.Rect(rect).size, pygame.SRCALPHA, 32)
-    pygame.draw.rect(shape_surf, color, shape_surf.get_rect())
-    surface.blit(shape_surf, rect)
+        vision = self.snake.vision(self.snake.vision_radius)
+        positions = [
+            pos
+            for i in range(self.snake.vision_radius)
+            for pos in perimeter(self.snake.head(), self.snake.direction, i + 1)
+        ]
+        for pos, blocked in zip(positions, vision):
+            color = red if blocked else green
+            render_pixel_alpha(pos, self.display, self.camera, color)
@@ -0,0 +1,49 @@
+import numpy as np
+from .snake.batch import BatchGame, game_seeds
+from .ai_state import BatchStateEncoder, ACTIONS
+from .ai.numpy_net import PopulationNet
+
+
+def play_population(
+    nets,
+    repetition_runs,
+    vision_radius,
+    max_hunger,
+    seed=None,
+    common_random_numbers=False,
+):
+    """
+    Play repetition_runs games with every net of a population.
+
+    All games are played in lockstep in a single BatchGame, and the
+    actions of all nets are computed at once by a PopulationNet.
+
+    :nets: List of NumpyNet with equal layer sizes, or a PopulationNet
+    :repetition_runs: Number of games per net
+    :vision_radius: Vision radius of the snakes
+    :max_hunger: Steps a snake survives without eating
+    :seed: Seed from which the food spawns of all games are drawn
+    :common_random_numbers: If True, run i of every net uses the same
+    food spawn seed, so all nets are scored on the same random events
+    :return: Scores, int array of shape (len(nets), repetition_runs)
+    """
+    if isinstance(nets, PopulationNet):
+        population_net = nets
+    else:
+        population_net = PopulationNet(nets)
+    n_nets = population_net.n_nets
+    n_games = n_nets * repetition_runs
+    if common_random_numbers:
+        seeds = np.tile(game_seeds(seed, repetition_runs), n_nets)
+    else:
+        seeds = game_seeds(seed, n_games)
+
+    game = BatchGame(n_games, max_hunger=max_hunger, auto_reset=False, seed=seeds)
+    encoder = BatchStateEncoder(vision_radius, game)
+    turns = np.array([turn.value for turn in ACTIONS], dtype=np.int64)
+
+    while not game.done.all():
+        states = encoder.encode(game).reshape(n_nets, repetition_runs, -1)
+        actions = population_net.act(states).reshape(-1)
+        game.step(turns[actions])
+    return game.score.reshape(n_nets, repetition_runs)
@@ -1,5 +1,14 @@
+import numpy as np
 from .evolpy.abstract_individuum import AbstractIndividuum
-from .ai.nnet import EvolvingNeuralNet
+from .ai.nnet import (
+    EvolvingNeuralNet,
+    crossover_genomes,
+    layer_segments,
+    genome_size,
+    mutate_genomes,
+    population_net,
+    random_genomes,
+)
 
 # from .ai_game import AIGame
 from .snake.snake import Snake
@@ -20,10 +29,17 @@ INPUT_LAYER = perimeter_pixel() + 4
 HIDDEN_LAYER = 24
 HIDDEN_LAYER2 = 24
 OUTPUT_LAYER = 3
+LAYER_SIZES = (INPUT_LAYER, HIDDEN_LAYER, HIDDEN_LAYER2, OUTPUT_LAYER)
+
+# Activation of the hidden layers, None for a linear net
+ACTIVATION = None
 
 # Hunger determines how many steps snake can go without eating
 MAX_HUNGER = 30
 
+# Fraction of the weights that are changed by mutate
+MUTATION_RATE = 0.05
+
 
 class AISnake(Snake, AbstractIndividuum):
     """
@@ -38,46 +54,258 @@ class AISnake(Snake, AbstractIndividuum):
         self.vision_radius = VISION_RADIUS
 
     @classmethod
-    def new_random(cls):
+    def new_random(cls, rng=None):
+        """
+        Snake with random weights.
+
+        :rng: numpy Generator, if None the global numpy random state is used
+        """
         obj = cls.__new__(cls)
         super(AISnake, obj).__init__()
-        obj.neural_net = EvolvingNeuralNet(
-            [INPUT_LAYER, HIDDEN_LAYER, HIDDEN_LAYER2, OUTPUT_LAYER], bias=False
+        obj.neural_net = EvolvingNeuralNet.from_genome(
+            list(LAYER_SIZES),
+            random_genomes(1, LAYER_SIZES, bias=False, rng=rng)[0],
+            False,
+            ACTIVATION,
         )
         obj.max_hunger = MAX_HUNGER
         obj.vision_radius = VISION_RADIUS
         return obj
 
-    def get_fitness(self, repetition_runs=10):
+    def get_fitness(self, repetition_runs=10, seed=None):
         """
         Returns fitness.
 
         Calculates average of n runs to decrease
         the influence of luck, i.e. good food spawns
+
+        The games are played with BatchGame like in
+        get_population_fitness(), the engine Evolution trains
+        with, so a snake has the same fitness for the same seed
+        on both paths. AIGame plays single games to watch them,
+        its scores only agree in distribution.
+
+        :repetition_runs: Number of games to average over
+        :seed: Evaluation seed of the food spawns. Snakes evaluated
+        with the same seed play on the same food spawns, as with
+        get_population_fitness(common_random_numbers=True).
         """
-        from .ai_game import AIGame
+        return self.get_population_fitness([self], repetition_runs, seed)[0]
 
-        fitness = 0
-        game = AIGame(self)
-        for _ in range(repetition_runs):
-            game.play_ai(visible=False)
-            fitness += game.score
-            game.reset()
-        return fitness / repetition_runs
+    @classmethod
+    def get_population_fitness(
+        cls, population, repetition_runs=10, seed=None, common_random_numbers=False
+    ):
+        """
+        Returns fitness of all snakes of a population.
 
-    def mutate(self):
+        Plays the games of all snakes in lockstep and evaluates all
+        neural nets with one batched forward pass per layer, instead
+        of calling get_fitness() for each snake.
+
+        :population: List of AISnake
+        :repetition_runs: Number of games to average over
+        :seed: Evaluation seed of the food spawns
+        :common_random_numbers: If True, all snakes are scored on the
+        same food spawn seeds
+        :return: List of fitness values
         """
-        Mutate 5 % of all genes
+        from .ai_population import play_population
+
+        nets = [snake.neural_net.numpy_net() for snake in population]
+        scores = play_population(
+            nets,
+            repetition_runs,
+            population[0].vision_radius,
+            population[0].max_hunger,
+            seed=seed,
+            common_random_numbers=common_random_numbers,
+        )
+        return scores.mean(axis=1).tolist()
+
+    @classmethod
+    def new_random_genomes(cls, n, rng=None):
+        return random_genomes(n, LAYER_SIZES, bias=False, rng=rng)
+
+    @classmethod
+    def population_genomes(cls, population):
+        return np.stack([snake.neural_net.genome for snake in population])
+
+    @classmethod
+    def genome_segments(cls):
+        return layer_segments(LAYER_SIZES)
+
+    @classmethod
+    def get_genomes_fitness(
+        cls,
+        genomes,
+        repetition_runs=10,
+        seed=None,
+        common_random_numbers=False,
+        scales=None,
+    ):
+        """
+        Fitness of the snakes with the given genomes, see
+        get_population_fitness(). Quantized genomes are not
+        dequantized, their int8 scales are applied to the layer
+        outputs (see population_net()).
+        """
+        return cls.get_genomes_scores(
+            genomes, repetition_runs, seed, common_random_numbers, scales
+        ).mean(axis=1)
+
+    @classmethod
+    def get_genomes_scores(
+        cls,
+        genomes,
+        repetition_runs=10,
+        seed=None,
+        common_random_numbers=False,
+        scales=None,
+    ):
+        """
+        Scores of repetition_runs games of the snakes with
+        the given genomes, array of shape (snakes, runs).
+        """
+        from .ai_population import play_population
+
+        return play_population(
+            population_net(genomes, LAYER_SIZES, scales, ACTIVATION),
+            repetition_runs,
+            VISION_RADIUS,
+            MAX_HUNGER,
+            seed=seed,
+            common_random_numbers=common_random_numbers,
+        )
+
+    @classmethod
+    def recombine_genomes(cls, genomes_a, genomes_b, rng=None):
+        return crossover_genomes(genomes_a, genomes_b, LAYER_SIZES, "uniform", rng=rng)
+
+    @classmethod
+    def mutate_genomes(cls, genomes, rng=None):
+        n_weights = genome_size(LAYER_SIZES) - sum(LAYER_SIZES[1:])
+        mutate_genomes(genomes, LAYER_SIZES, int(n_weights * MUTATION_RATE), rng=rng)
+
+    @classmethod
+    def save_population(
+        cls, population, fitness, generation, file_name, dtype="float32"
+    ):
+        """
+        Save genomes and fitness of a population as a single
+        archive in the model folder (see ai/archive.py).
+
+        :dtype: Store genomes as "float32", "float16" or "int8"
+        """
+        from .ai.archive import PopulationArchive, save_population
+
+        net = population[0].neural_net
+        genomes = np.stack([snake.neural_net.genome for snake in population])
+        archive = PopulationArchive(
+            genomes, fitness, generation, net.layer_sizes, net.bias
+        )
+        save_population(archive, file_name, dtype)
+
+    @classmethod
+    def load_population(cls, file_name):
         """
-        # Total number of weights
-        total_num_weights = 0
-        for i in range(len(self.neural_net.layer_sizes) - 1):
-            total_num_weights += (
-                self.neural_net.layer_sizes[i] * self.neural_net.layer_sizes[i + 1]
+        Load a population saved by save_population().
+
+        The genomes of the snakes are copy on write views into the
+        memory mapped archive, they are read from disk on first use.
+        float16 and int8 archives are converted to float32 on load.
+
+        :return: (population, fitness, generation)
+        """
+        from .ai.archive import load_population
+
+        archive = load_population(file_name, mmap_mode="c")
+        genomes = archive.genomes
+        if genomes.dtype != np.float32:
+            genomes = archive.float_genomes()
+        population = [
+            cls(
+                EvolvingNeuralNet.from_genome(
+                    archive.layer_sizes, genome, archive.bias, ACTIVATION
+                )
             )
-        self.neural_net.mutate(int(total_num_weights * 0.05))
+            for genome in genomes
+        ]
+        return population, list(archive.fitness), archive.generation
+
+    @classmethod
+    def load_checkpoints(cls, file_names):
+        """
+        Load a population saved as one .pth file per snake (see
+        EvolvingNeuralNet.save()), the format before population
+        archives. Save it with save_population() to convert it.
+
+        :file_names: Files in the model folder, one per snake
+        :return: List of AISnake
+        """
+        population = []
+        for file_name in file_names:
+            snake = cls.new_random()
+            snake.neural_net.load(file_name)
+            population.append(snake)
+        return population
+
+    def mutate(self, rng=None):
+        """
+        Mutate 5 % of all genes
+        """
+        self.neural_net.mutate(
+            int(sum(self.neural_net.num_weights) * MUTATION_RATE), rng=rng
+        )
+
+    @classmethod
+    def mutate_population(cls, population, rng=None):
+        """
+        Mutate 5 % of all genes of every snake, with one
+        mutate_genomes() call for the whole list.
+        """
+        if not population:
+            return
+        net = population[0].neural_net
+        genomes = np.stack([snake.neural_net.genome for snake in population])
+        mutate_genomes(
+            genomes,
+            net.layer_sizes,
+            int(sum(net.num_weights) * MUTATION_RATE),
+            2 if net.bias else 0,
+            rng=rng,
+        )
+        for snake, genome in zip(population, genomes):
+            snake.neural_net.genome[:] = genome
+            snake.neural_net.weights_changed()
 
     @staticmethod
-    def recombine(parents):
-        offsprings = parents[0].neural_net.recombine(parents[1].neural_net)
+    def recombine(parents, rng=None):
+        offsprings = parents[0].neural_net.recombine(parents[1].neural_net, rng)
         return [AISnake(neural_net) for neural_net in offsprings]
+
+    @classmethod
+    def recombine_population(cls, parent_lists, rng=None):
+        """
+        Uniform crossover of all parent pairs with one
+        crossover_genomes() call.
+        """
+        if not parent_lists:
+            return []
+        net = parent_lists[0][0].neural_net
+        genomes_a = np.stack([parents[0].neural_net.genome for parents in parent_lists])
+        genomes_b = np.stack([parents[1].neural_net.genome for parents in parent_lists])
+        offsprings = crossover_genomes(
+            genomes_a, genomes_b, net.layer_sizes, "uniform", net.bias, rng
+        )
+        return [
+            [
+                AISnake(
+                    EvolvingNeuralNet.from_genome(
+                        net.layer_sizes, genomes[i], net.bias, net.activation
+                    )
+                )
+                for genomes in offsprings
+            ]
+            for i in range(len(parent_lists))
+        ]
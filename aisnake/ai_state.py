@@ -0,0 +1,148 @@
+import numpy as np
+from .snake.datatypes import Turn
+from .snake.cells import relative_offset, vision_table, SNAKE_ROTATION
+from .snake.board import vision_offsets
+
+# Turn of each output of the AI model
+ACTIONS = (Turn.NO, Turn.RIGHT, Turn.LEFT)
+
+
+class StateEncoder(object):
+    """
+    Encodes the state of a game that is fed into the AI model.
+
+    State layout:
+    - Obstacle detection: One entry per field on the perimeters
+      1...vision_radius around the head, in the order of perimeter()
+    - Food detection: [ahead, right, behind, left] of the snake
+
+    The state is written into a preallocated float32 buffer that
+    is reused for every step. The snake keeps its occupancy grid
+    up to date on every move, so encoding a step is a single
+    gather of the vision fields into the buffer plus the four
+    food entries, without building lists or new arrays.
+    """
+
+    def __init__(self, vision_radius):
+        """
+        :vision_radius: Vision radius of the snake
+        """
+        self.vision_radius = vision_radius
+        self.n_vision = vision_offsets(vision_radius).shape[1]
+        self.size = self.n_vision + 4
+        self.buffer = np.zeros(self.size, dtype=np.float32)
+        self.vision = self.buffer[: self.n_vision]
+        # Value of each entry in the packed key
+        self.bits = 2.0 ** np.arange(self.size)
+        self._tensor = None
+
+    def encode(self, snake, food):
+        """
+        Update the buffer with the current state.
+
+        :snake: Snake
+        :food: Food
+        :return: The buffer. It is overwritten by the next call,
+        copy it if it must be kept.
+        """
+        head = snake.cells[-1]
+        direction_value = snake.direction.value
+        snake.board.vision(head, direction_value, self.vision_radius, out=self.vision)
+
+        # Food state [ahead, right, behind, left]
+        x, y = relative_offset(food.cell, head, direction_value)
+        buffer, n = self.buffer, self.n_vision
+        buffer[n] = y > 0
+        buffer[n + 1] = x > 0
+        buffer[n + 2] = y < 0
+        buffer[n + 3] = x < 0
+        return buffer
+
+    def key(self):
+        """
+        The current state packed into an integer, bit i is entry i
+        of the buffer. All entries are 0 or 1, so the key identifies
+        the state.
+        """
+        return int(self.buffer.dot(self.bits))
+
+    def tensor(self):
+        """
+        Torch tensor that shares memory with the buffer, it is
+        created once and reflects every encode().
+        """
+        if self._tensor is None:
+            import torch
+
+            self._tensor = torch.from_numpy(self.buffer)
+        return self._tensor
+
+
+class BatchStateEncoder(object):
+    """
+    Encodes the states of all games of a BatchGame at once, with
+    the same layout as StateEncoder, into a preallocated float32
+    buffer of shape (n_games, size).
+    """
+
+    def __init__(self, vision_radius, game):
+        """
+        :vision_radius: Vision radius of the snakes
+        :game: BatchGame
+        """
+        self.vision_radius = vision_radius
+        self.vision_cells = batch_vision_cells(vision_radius, game.width, game.height)
+        self.rotation = np.array(SNAKE_ROTATION, dtype=np.int64)
+        self.n_vision = self.vision_cells.shape[2]
+        self.size = self.n_vision + 4
+        self.buffer = np.zeros((game.n_games, self.size), dtype=np.float32)
+        # Start of each game in the flattened occupancy
+        self.row_start = (np.arange(game.n_games) * game.occupancy.shape[1])[:, None]
+
+    def encode(self, game):
+        """
+        Update the buffer with the current states of all games.
+
+        :game: BatchGame
+        :return: The buffer. It is overwritten by the next call,
+        copy it if it must be kept.
+        """
+        width = game.width
+        head = game.heads()
+        direction = game.direction
+
+        # Obstacle state, a single gather from the flattened occupancy
+        cells = self.vision_cells[head, direction]
+        occupancy = game.occupancy.reshape(-1)
+        np.greater(
+            occupancy[self.row_start + cells], 0, out=self.buffer[:, : self.n_vision]
+        )
+
+        # Food state [ahead, right, behind, left]
+        hx, hy = head % width, head // width
+        fx, fy = game.food % width - hx, game.food // width - hy
+        xx, xy, yx, yy = self.rotation[direction].T
+        rx, ry = xx * fx + xy * fy, yx * fx + yy * fy
+        n = self.n_vision
+        self.buffer[:, n] = ry > 0
+        self.buffer[:, n + 1] = rx > 0
+        self.buffer[:, n + 2] = ry < 0
+        self.buffer[:, n + 3] = rx < 0
+        return self.buffer
+
+
+def batch_vision_cells(radius, width, height):
+    """
+    Cells of the fields of vision_table() around every field of
+    a BatchGame bord. Fields outside the bord map to the wall
+    column width * height.
+
+    :return: Array of shape (width * height, 4, number of fields),
+    indexed by head cell and Direction value
+    """
+    table = vision_table(radius)
+    cell = np.arange(width * height)
+    x = (cell % width)[:, None, None] + table[None, :, :, 0]
+    y = (cell // width)[:, None, None] + table[None, :, :, 1]
+    inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+    return np.where(inside, y * width + x, width * height)
@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from functools import lru_cache
+from inspect import signature, Parameter
 
 
 class AbstractIndividuum(ABC):
@@ -9,6 +11,8 @@ class AbstractIndividuum(ABC):
         Return an individuum with a random chromosome.
 
         This is used to initate a random initial population.
+        If it takes a keyword argument rng, Evolution passes
+        its numpy Generator.
 
         .. note::
         You MUST override this function.
@@ -20,6 +24,10 @@ class AbstractIndividuum(ABC):
         """
         Evaluate the fitness function.
 
+        If Evolution is seeded and it takes a keyword argument
+        seed, it is called with a seed, which should make the
+        evaluation reproducible.
+
         :return: int of float
 
         .. note::
@@ -27,6 +35,26 @@ class AbstractIndividuum(ABC):
         """
         pass
 
+    @classmethod
+    def get_population_fitness(cls, population, seed=None, common_random_numbers=False):
+        """
+        Evaluate the fitness of a whole population at once.
+
+        Override this if evaluating many individuums together is
+        cheaper than calling get_fitness() on each of them.
+
+        :population: List of individuums
+        :seed: Evaluation seed, None if Evolution is not seeded
+        :common_random_numbers: Evaluate all individuums on the same
+        random events
+        :return: List of fitness values, or None to fall back to
+        get_fitness() of each individuum
+
+        .. note::
+        You CAN override this function.
+        """
+        return None
+
     # @staticmethod
     @abstractmethod
     def mutate(self):
@@ -38,6 +66,24 @@ class AbstractIndividuum(ABC):
         """
         pass
 
+    @classmethod
+    def mutate_population(cls, population, rng=None):
+        """
+        Mutate all individuums of a list at once.
+
+        Override this if mutating many individuums together is
+        cheaper than calling mutate() on each of them.
+
+        :population: List of individuums
+        :rng: numpy Generator of Evolution, passed on to mutate()
+        if it takes it
+
+        .. note::
+        You CAN override this function.
+        """
+        for individuum in population:
+            call_accepted(individuum.mutate, rng=rng)
+
     @staticmethod
     @abstractmethod
     def recombine(parents):
@@ -54,6 +100,135 @@ class AbstractIndividuum(ABC):
         """
         pass
 
+    @classmethod
+    def recombine_population(cls, parent_lists, rng=None):
+        """
+        Recombination of many parent lists at once.
+
+        Override this if breeding many offsprings together is
+        cheaper than calling recombine() for each parents.
+
+        :parent_lists: List of parents, each a list as for recombine()
+        :rng: numpy Generator of Evolution, passed on to recombine()
+        if it takes it
+
+        :return: List of offspring lists, one per parents
+
+        .. note::
+        You CAN override this function.
+        """
+        return [
+            call_accepted(cls.recombine, parents, rng=rng) for parents in parent_lists
+        ]
+
+    # Chromosomes as rows of a float32 array, needed only by
+    # Evolution.optimize_store(), the evaluators of evaluators.py
+    # and FitnessCache
+
+    @classmethod
+    def population_genomes(cls, population):
+        """
+        Return the chromosomes of a list of individuums.
+
+        :return: float32 array of shape (len(population), genome size)
+
+        .. note::
+        You MUST override this function to use an evaluator
+        or a fitness cache in Evolution.optimize().
+        """
+        raise NotImplementedError("Genome mode is not implemented")
+
+    @classmethod
+    def new_random_genomes(cls, n, rng=None):
+        """
+        Return n random chromosomes.
+
+        :rng: numpy Generator of Evolution
+
+        :return: float32 array of shape (n, genome size)
+
+        .. note::
+        You MUST override this function to use
+        Evolution.optimize_store().
+        """
+        raise NotImplementedError("Genome mode is not implemented")
+
+    @classmethod
+    def get_genomes_fitness(
+        cls, genomes, seed=None, common_random_numbers=False, scales=None
+    ):
+        """
+        Evaluate the fitness of the individuums with the
+        chromosomes in the rows of genomes.
+
+        Genomes may be float32, float16 or int8. int8 genomes come
+        with scales of shape (number of genomes, number of segments),
+        see quantize.py.
+
+        :return: Array of fitness values
+
+        .. note::
+        You MUST override this function to use an evaluator
+        or Evolution.optimize_store().
+        """
+        raise NotImplementedError("Genome mode is not implemented")
+
+    @classmethod
+    def get_genomes_scores(
+        cls, genomes, repetition_runs, seed=None, common_random_numbers=False
+    ):
+        """
+        Evaluate repetition_runs noisy samples of the fitness of the
+        individuums with the chromosomes in the rows of genomes,
+        e.g. the scores of single games. Needed by RacingEvaluator.
+
+        :return: Array of shape (number of genomes, repetition_runs)
+
+        .. note::
+        You MUST override this function to use a RacingEvaluator.
+        """
+        raise NotImplementedError("Genome mode is not implemented")
+
+    @classmethod
+    def genome_segments(cls):
+        """
+        Return a list of (start, stop) column ranges of the genome
+        that share a scale when genomes are stored as int8, e.g.
+        the layers of a neural net. None for a single scale.
+
+        .. note::
+        You CAN override this function.
+        """
+        return None
+
+    @classmethod
+    def recombine_genomes(cls, genomes_a, genomes_b, rng=None):
+        """
+        Recombine row i of genomes_a with row i of genomes_b.
+
+        :rng: numpy Generator of Evolution
+
+        :return: Two arrays with one offspring per pair each
+
+        .. note::
+        You MUST override this function to use
+        Evolution.optimize_store().
+        """
+        raise NotImplementedError("Genome mode is not implemented")
+
+    @classmethod
+    def mutate_genomes(cls, genomes, rng=None):
+        """
+        Mutate the chromosomes in the rows of genomes in place.
+
+        :rng: numpy Generator of Evolution
+
+        .. note::
+        You MUST override this function to use
+        Evolution.optimize_store().
+        """
+        raise NotImplementedError("Genome mode is not implemented")
+
     # def get_chromosome(self):
     #     """
     #     Returns the chromosome of the Individuum.
@@ -61,6 +236,29 @@ class AbstractIndividuum(ABC):
     #     return self.chromosome
 
 
+def call_accepted(function, *args, **kwargs):
+    """
+    Call function with args and those of the keyword arguments
+    it accepts, e.g. seed or rng for individuums whose methods
+    were written without them.
+    """
+    names = accepted_keywords(getattr(function, "__func__", function))
+    if names is not None:
+        kwargs = {k: v for k, v in kwargs.items() if k in names}
+    return function(*args, **kwargs)
+
+
+@lru_cache(maxsize=None)
+def accepted_keywords(function):
+    """
+    Names of the parameters of function, None if it takes **kwargs.
+    """
+    parameters = signature(function).parameters.values()
+    if any(p.kind == Parameter.VAR_KEYWORD for p in parameters):
+        return None
+    return frozenset(p.name for p in parameters)
+
+
 # class AbstractIndividuum(ABC):
 
 #     # Chromosome: List of genes
@@ -0,0 +1,346 @@
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+
+class Evaluator(object):
+    """
+    Evaluates the fitness of a population, see
+    Evolution.optimize(evaluator=...).
+
+    Evolution draws one evaluation seed per chunk of chunks() and
+    passes the genomes with these seeds to evaluate(). Evaluators
+    are context managers that close() their workers on exit, e.g.
+    with ProcessEvaluator() as evaluator: ...
+    """
+
+    # Whether the fitness of a genome does not depend on the other
+    # genomes evaluated with it, required by a FitnessCache
+    independent = True
+
+    def chunks(self, n):
+        """
+        Slices that cover n genomes, one evaluation seed each.
+        """
+        raise NotImplementedError("Evaluator must implement chunks")
+
+    def evaluate(self, individuum, genomes, seeds, common_random_numbers=False):
+        """
+        Fitness of all genomes, in their order.
+
+        :individuum: Individuum class, implements get_genomes_fitness
+        :genomes: Array of shape (population size, genome size)
+        :seeds: One evaluation seed (or None) per chunk
+        :return: float64 array of shape (population size,)
+        """
+        raise NotImplementedError("Evaluator must implement evaluate")
+
+    def close(self):
+        """
+        Shut down the workers.
+        """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SerialEvaluator(Evaluator):
+    """
+    Evaluates the fitness of a population in chunks of genomes.
+
+    Chunks and their seeds depend only on the population and
+    chunk_size, so every evaluator returns the same fitness for
+    the same Evolution seed, regardless of the number of workers.
+
+    This evaluator works through the chunks in the calling process,
+    ThreadEvaluator and ProcessEvaluator distribute them to workers.
+    """
+
+    def __init__(self, chunk_size=1000):
+        """
+        :chunk_size: Number of genomes evaluated together
+        """
+        if chunk_size <= 0:
+            raise ValueError("Expect chunk_size to be positive")
+        self.chunk_size = chunk_size
+
+    def chunks(self, n):
+        """
+        Slices of at most chunk_size genomes that cover n genomes.
+        """
+        return [
+            slice(start, min(start + self.chunk_size, n))
+            for start in range(0, n, self.chunk_size)
+        ]
+
+    def evaluate(self, individuum, genomes, seeds, common_random_numbers=False):
+        tasks = [
+            (individuum, genomes[chunk], seed, common_random_numbers)
+            for chunk, seed in zip(self.chunks(len(genomes)), seeds)
+        ]
+        return np.concatenate(list(self.map(_evaluate_chunk, tasks)))
+
+    def map(self, function, tasks):
+        return map(function, tasks)
+
+
+class ThreadEvaluator(SerialEvaluator):
+    """
+    Evaluates chunks in a thread pool. Helps where the evaluation
+    releases the GIL, e.g. in large NumPy operations.
+    """
+
+    def __init__(self, n_workers=None, chunk_size=1000):
+        """
+        :n_workers: Number of threads, if None the number of CPUs
+        """
+        super().__init__(chunk_size)
+        self.n_workers = n_workers or os.cpu_count()
+        self.executor = None
+
+    def map(self, function, tasks):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(self.n_workers)
+        return self.executor.map(function, tasks)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+
+class ProcessEvaluator(ThreadEvaluator):
+    """
+    Evaluates chunks in a pool of worker processes. Workers
+    receive the individuum class by reference and the genomes
+    of their chunk, never whole individuums. The pool is kept
+    alive between generations until close().
+    """
+
+    def map(self, function, tasks):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.n_workers)
+        return self.executor.map(function, tasks)
+
+
+class RacingEvaluator(Evaluator):
+    """
+    Evaluates the population by racing, with get_genomes_scores of
+    the individuum class.
+
+    Every genome plays initial_runs games. Further rounds of
+    round_runs games go only to genomes whose confidence interval
+    of the mean score still contains the cutoff, the mean score
+    of the genome ranked at cutoff_rate of the population, i.e.
+    genomes whose rank relative to the cutoff is still unclear.
+    Racing stops when no genome is unclear, or the budget of games
+    of the generation is spent. Games are thus spent on genomes
+    whose selection depends on them, and not on genomes that die
+    in the first steps.
+
+    The whole population is raced at once, as a single chunk. The
+    cutoff depends on all genomes, so racing cannot be combined
+    with a FitnessCache that leaves out cached genomes.
+    """
+
+    independent = False
+
+    def __init__(
+        self,
+        budget=None,
+        initial_runs=2,
+        round_runs=2,
+        max_runs=20,
+        cutoff_rate=0.2,
+        z=2.0,
+    ):
+        """
+        :budget: Number of games per generation, if None 10 games
+        per genome
+        :initial_runs: Number of games of each genome, at least 2
+        to estimate the variance of the scores
+        :round_runs: Number of games of each unclear genome per round
+        :max_runs: Maximum number of games of a genome
+        :cutoff_rate: Fraction of the population above the cutoff,
+        e.g. the elites or the parents that are selected most
+        :z: Width of the confidence intervals in standard errors
+        """
+        if initial_runs < 2 or round_runs <= 0 or max_runs < initial_runs:
+            raise ValueError("Expect 2 <= initial_runs <= max_runs and round_runs > 0")
+        if not 0 < cutoff_rate <= 1:
+            raise ValueError("Expect cutoff_rate in (0, 1]")
+        self.budget = budget
+        self.initial_runs = initial_runs
+        self.round_runs = round_runs
+        self.max_runs = max_runs
+        self.cutoff_rate = cutoff_rate
+        self.z = z
+        # Number of games played in the last generation
+        self.games = 0
+
+    def chunks(self, n):
+        return [slice(0, n)]
+
+    def evaluate(self, individuum, genomes, seeds, common_random_numbers=False):
+        n = len(genomes)
+        budget = 10 * n if self.budget is None else self.budget
+        if budget < self.initial_runs * n:
+            raise ValueError("Expect budget of at least initial_runs games per genome")
+        # Every round is played with its own seed
+        rng = None if seeds[0] is None else np.random.default_rng(seeds[0])
+
+        total = np.zeros(n)
+        squares = np.zeros(n)
+        runs = np.zeros(n, dtype=np.int64)
+        rank = n - max(1, int(self.cutoff_rate * n))
+        index, n_runs = np.arange(n), self.initial_runs
+        self.games = 0
+        while True:
+            scores = individuum.get_genomes_scores(
+                genomes[index],
+                n_runs,
+                seed=None if rng is None else int(rng.integers(2**32)),
+                common_random_numbers=common_random_numbers,
+            )
+            total[index] += scores.sum(axis=1)
+            squares[index] += np.square(scores).sum(axis=1)
+            runs[index] += n_runs
+            self.games += len(index) * n_runs
+
+            # Confidence intervals of the mean scores
+            mean = total / runs
+            variance = np.maximum(squares / runs - mean**2, 0) * runs / (runs - 1)
+            half_width = self.z * np.sqrt(variance / runs)
+            cutoff = np.partition(mean, rank)[rank]
+            distance = np.abs(mean - cutoff)
+            unclear = (distance <= half_width) & (
+                runs + self.round_runs <= self.max_runs
+            )
+
+            n_runs = self.round_runs
+            affordable = (budget - self.games) // n_runs
+            index = np.flatnonzero(unclear)
+            if len(index) == 0 or affordable == 0:
+                return mean
+            if len(index) > affordable:
+                # Genomes closest to the cutoff first
+                order = np.argsort(
+                    distance[index] / np.maximum(half_width[index], 1e-12),
+                    kind="stable",
+                )
+                index = np.sort(index[order[:affordable]])
+
+
+class SharedMemoryEvaluator(ProcessEvaluator):
+    """
+    Process pool evaluator that places the genome matrix and the
+    fitness array in one multiprocessing.shared_memory segment.
+    Tasks only carry index ranges, workers read their genomes
+    from the segment and write the fitness back into it.
+
+    The segment is reused between generations as long as the
+    shape of the genomes does not change, and workers attach
+    to it once. It is freed by close(), and otherwise when the
+    evaluator is garbage collected or the interpreter exits.
+    """
+
+    def __init__(self, n_workers=None, chunk_size=1000):
+        super().__init__(n_workers, chunk_size)
+        self.segment = None
+        self.finalizer = None
+        self.layout = None
+
+    def evaluate(self, individuum, genomes, seeds, common_random_numbers=False):
+        genomes = np.asarray(genomes)
+        layout = (genomes.shape, genomes.dtype.str)
+        if layout != self.layout:
+            self.release()
+            size = _fitness_offset(*layout) + 8 * len(genomes)
+            self.segment = shared_memory.SharedMemory(create=True, size=size)
+            self.finalizer = weakref.finalize(self, _free_segment, self.segment)
+            self.layout = layout
+        shared_genomes, shared_fitness = _shared_arrays(self.segment.buf, *layout)
+        shared_genomes[:] = genomes
+
+        tasks = [
+            (individuum, self.segment.name, layout, chunk, seed, common_random_numbers)
+            for chunk, seed in zip(self.chunks(len(genomes)), seeds)
+        ]
+        list(self.map(_evaluate_shared, tasks))
+        fitness = shared_fitness.copy()
+        del shared_genomes, shared_fitness
+        return fitness
+
+    def release(self):
+        """
+        Free the shared memory segment.
+        """
+        if self.segment is not None:
+            self.finalizer()
+            self.segment = None
+            self.layout = None
+
+    def close(self):
+        super().close()
+        self.release()
+
+
+# Segments the worker process is attached to, by name
+_attached = {}
+
+
+def _free_segment(segment):
+    try:
+        segment.close()
+    except BufferError:
+        # Views of a failed evaluation are still alive, the
+        # mapping goes away with the process
+        pass
+    segment.unlink()
+
+
+def _fitness_offset(shape, dtype):
+    nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return -(-nbytes // 8) * 8
+
+
+def _shared_arrays(buffer, shape, dtype):
+    genomes = np.ndarray(shape, dtype=dtype, buffer=buffer)
+    fitness = np.ndarray(
+        (shape[0],),
+        dtype=np.float64,
+        buffer=buffer,
+        offset=_fitness_offset(shape, dtype),
+    )
+    return genomes, fitness
+
+
+def _evaluate_shared(task):
+    individuum, name, layout, chunk, seed, common_random_numbers = task
+    if name not in _attached:
+        # The parent has moved on to a new segment, the views into
+        # the old one must be gone before it can be closed
+        while _attached:
+            _, (segment, arrays) = _attached.popitem()
+            del arrays
+            segment.close()
+        segment = shared_memory.SharedMemory(name=name)
+        _attached[name] = (segment, _shared_arrays(segment.buf, *layout))
+    genomes, fitness = _attached[name][1]
+    fitness[chunk] = individuum.get_genomes_fitness(
+        genomes[chunk], seed=seed, common_random_numbers=common_random_numbers
+    )
+
+
+def _evaluate_chunk(task):
+    individuum, genomes, seed, common_random_numbers = task
+    fitness = individuum.get_genomes_fitness(
+        genomes, seed=seed, common_random_numbers=common_random_numbers
+    )
+    return np.asarray(fitness, dtype=np.float64)
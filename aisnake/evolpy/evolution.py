@@ -1,6 +1,7 @@
 import random
 from copy import deepcopy
-from .abstract_individuum import AbstractIndividuum
+from .abstract_individuum import AbstractIndividuum, call_accepted
+from .store import PopulationStore
 import numpy as np
 
 
@@ -9,10 +10,30 @@ class Evolution(object):
     Playing field of Evolution
     """
 
-    def __init__(self, obj_individuum):
+    def __init__(self, obj_individuum, seed=None, selection="roulette"):
+        """
+        :obj_individuum: Class of the individuums, derived from AbstractIndividuum
+        :seed: Seed of the random generators for selection, crossover and
+        evaluation seeds. self.rng is a random.Random, self.np_rng a numpy
+        Generator derived from it, which is passed as rng to the hooks of
+        the individuum class that take it (new_random, mutate_population,
+        recombine_population, ...), so a seeded run can be reproduced.
+        If None, the global random module is used and individuums are
+        evaluated without seed.
+        :selection: Parent selection, one of SELECTIONS or a function
+        (fitness, n, rng) that returns n indices, see select_parents()
+        """
         if isinstance(obj_individuum, AbstractIndividuum):
             raise ValueError("Expect input of instance AbstractIndividuum")
+        if not callable(selection) and selection not in SELECTIONS:
+            raise ValueError(
+                "Expect selection to be one of {}".format(list(SELECTIONS))
+            )
         self.individuum = obj_individuum
+        self.selection = SELECTIONS.get(selection, selection)
+        self.seed = seed
+        self.rng = random if seed is None else random.Random(seed)
+        self.np_rng = np.random.default_rng(self.rng.randrange(2**32))
         print("Input ok.")
 
     def optimize(
@@ -27,10 +48,28 @@ class Evolution(object):
         offsprings_per_recombination=2,
         pop=None,
         add_individuum=None,
+        common_random_numbers=False,
+        evaluator=None,
+        fitness_cache=None,
     ):
         """
         Skeletons of operations to perform the evolutionary algorithm.
 
+        :common_random_numbers: If True, all individuums of a generation
+        are evaluated with the same seed, so they are scored on the same
+        random events (e.g. food spawns) and fitness differences are not
+        due to luck.
+        :evaluator: Evaluator of evaluators.py that evaluates the genomes
+        of the population in chunks, e.g. in a process pool. If None,
+        the population is evaluated in this process, see evaluate().
+        optimize() does not close the evaluator, so it can be reused
+        across runs. The caller owns its workers and shared memory and
+        frees them with close(), or by using it in a with statement.
+        :fitness_cache: FitnessCache of fitness_cache.py, genomes in the
+        cache (e.g. elites) are not evaluated again. With
+        common_random_numbers, each generation has a new seed, so
+        genomes are only reused on a seed they were scored on
+
         .. note::
         DO NOT override this function.
         """
@@ -53,13 +92,21 @@ class Evolution(object):
 
         # Initiate population
         if pop is None:
-            pop = [self.individuum.new_random() for _ in range(population_size)]
+            pop = [
+                call_accepted(self.individuum.new_random, rng=self.np_rng)
+                for _ in range(population_size)
+            ]
         if add_individuum is not None:
             pop[0] = add_individuum
+        rng = self.np_rng
+        # Subclasses that select parents pair by pair keep doing so
+        select_pairs = (
+            type(self).selection_of_parents is not Evolution.selection_of_parents
+        )
         fit = []
         for gen in range(max_generations + 1):
             # Evaluate fitness
-            fit = [ind.get_fitness() for ind in pop]
+            fit = self.evaluate(pop, common_random_numbers, evaluator, fitness_cache)
 
             # Callback
             if callback is None:
@@ -72,30 +119,48 @@ class Evolution(object):
                 print("An individuum reached its maximum fitness!")
                 return pop
 
-            # Create next generation
-            pop_child = []
-
-            for i in range(new_individuums // offsprings_per_recombination):
+            # Create next generation, all parents are selected at once
+            n_pairs = new_individuums // offsprings_per_recombination
+            if not select_pairs:
+                index = self.select_parents(fit, 2 * n_pairs, rng).reshape(n_pairs, 2)
+            pairs = []
+            for i in range(n_pairs):
 
                 # Select parents
-                parents = self.selection_of_parents(pop, fit)
+                if select_pairs:
+                    parents = self.selection_of_parents(pop, fit)
+                else:
+                    parents = [pop[j] for j in index[i]]
+
+                # Decide on recombination and mutation of the offsprings
+                is_crossover = self.rng.random() < crossover_rate
+                is_mutant = [
+                    self.rng.random() < mutation_rate
+                    for _ in range(offsprings_per_recombination)
+                ]
+                pairs.append((parents, is_crossover, is_mutant))
+
+            # Recombination of all crossover pairs at once
+            offsprings = iter(self.recombine_population([p for p, c, _ in pairs if c]))
 
-                # Recombination
-                if random.random() < crossover_rate:
-                    # Apply crossover function
-                    childs = self.recombine(parents)
+            pop_child = []
+            mutants = []
+            for parents, is_crossover, is_mutant in pairs:
+                if is_crossover:
+                    childs = next(offsprings)
                 else:
                     # Just take parents over to new generation
                     childs = [deepcopy(p) for p in parents]
 
-                # Mutation
-                for child in childs:
-                    if random.random() < mutation_rate:
-                        self.mutate(child)
-
-                    # Store in new population
+                # Store in new population
+                for child, mutant in zip(childs, is_mutant):
+                    if mutant:
+                        mutants.append(child)
                     pop_child.append(child)
 
+            # Mutation
+            self.mutate_population(mutants)
+
             # Take some parents over to the next population
             if old_individuums > 0:
                 # Find indices of N maximum values
@@ -114,6 +179,258 @@ class Evolution(object):
         print("Reached generations limit, no perfekt individuum found.")
         return pop
 
+    def optimize_store(
+        self,
+        path,
+        population_size=200,
+        max_generations=1000,
+        crossover_rate=0.8,
+        mutation_rate=0.1,
+        preservation_rate=0.0,
+        max_fitness=None,
+        callback=None,
+        chunk_size=10000,
+        common_random_numbers=False,
+        genome_dtype="float32",
+    ):
+        """
+        Evolutionary algorithm for populations larger than memory.
+
+        Same as optimize(), but the population is a PopulationStore
+        of chromosomes on disk, and individuums are evaluated and
+        bred in chunks of chunk_size. Memory use depends on the
+        chunk size, not on the population size. Requires the
+        genome methods of the individuum class (new_random_genomes,
+        get_genomes_fitness, recombine_genomes, mutate_genomes).
+
+        Two stores, path + ".a" and path + ".b", hold the current and
+        the next generation. Parents are selected with select_parents(),
+        each pair produces two offsprings.
+
+        :path: Path prefix of the stores
+        :chunk_size: Number of individuums evaluated and bred at once
+        :genome_dtype: Store genomes as "float32", "float16" or "int8",
+        int8 with one scale per segment of genome_segments()
+        :return: PopulationStore of the last generation, callback is
+        called with (store, fitness array, generation)
+        """
+        new_individuums = int((1 - preservation_rate) * population_size)
+        new_individuums -= new_individuums % 2
+        old_individuums = population_size - new_individuums
+        chunk_size += chunk_size % 2
+
+        self.display(
+            {
+                "Total population": population_size,
+                "From new generation": new_individuums,
+                "From old generation": old_individuums,
+                "Chunk size": chunk_size,
+                "mutation_rate": mutation_rate,
+                "crossover_rate": crossover_rate,
+                "preservation_rate": preservation_rate,
+            }
+        )
+
+        # Initiate population
+        rng = self.np_rng
+        sample = call_accepted(self.individuum.new_random_genomes, 1, rng=rng)
+        genome_size = sample.shape[1]
+        segments = self.individuum.genome_segments()
+        pop, pop_child = [
+            PopulationStore(
+                path + suffix, population_size, genome_size, genome_dtype, segments
+            )
+            for suffix in (".a", ".b")
+        ]
+        for chunk in pop.chunks(chunk_size):
+            pop.write(
+                chunk.start,
+                call_accepted(
+                    self.individuum.new_random_genomes,
+                    chunk.stop - chunk.start,
+                    rng=rng,
+                ),
+            )
+
+        for gen in range(max_generations + 1):
+            # Evaluate fitness
+            fit = self.evaluate_store(pop, chunk_size, common_random_numbers)
+
+            # Callback
+            if callback is None:
+                self.default_callback(pop, fit, gen)
+            else:
+                callback(pop, fit, gen)
+
+            # Terminate
+            if self.terminate_max_fitness(fit, max_fitness):
+                print("An individuum reached its maximum fitness!")
+                break
+
+            # Create next generation, pairs of parents are consecutive
+            parents = self.select_parents(fit, new_individuums, rng)
+            for start in range(0, new_individuums, chunk_size):
+                index = parents[start : start + chunk_size]
+                genomes_a = pop.read(index[0::2])
+                genomes_b = pop.read(index[1::2])
+
+                # Recombination, other pairs are taken over
+                off_a, off_b = call_accepted(
+                    self.individuum.recombine_genomes, genomes_a, genomes_b, rng=rng
+                )
+                keep = rng.random(len(index) // 2) >= crossover_rate
+                off_a[keep], off_b[keep] = genomes_a[keep], genomes_b[keep]
+                childs = np.empty((len(index), genome_size), dtype=np.float32)
+                childs[0::2], childs[1::2] = off_a, off_b
+
+                # Mutation
+                mutants = rng.random(len(index)) < mutation_rate
+                if mutants.any():
+                    genomes = childs[mutants]
+                    call_accepted(self.individuum.mutate_genomes, genomes, rng=rng)
+                    childs[mutants] = genomes
+
+                pop_child.write(start, childs)
+
+            # Take some parents over to the next population
+            if old_individuums > 0:
+                best = np.sort(
+                    np.argpartition(fit, -old_individuums)[-old_individuums:]
+                )
+                for start in range(0, old_individuums, chunk_size):
+                    index = best[start : start + chunk_size]
+                    pop_child.write(new_individuums + start, pop.read(index))
+
+            # replace population by children
+            pop, pop_child = pop_child, pop
+        else:
+            print("Reached generations limit, no perfekt individuum found.")
+        pop.flush()
+        return pop
+
+    def evaluate_store(self, pop, chunk_size, common_random_numbers=False):
+        """
+        Evaluate the fitness of all individuums of a PopulationStore
+        chunk by chunk, and store it in pop.fitness.
+
+        Evaluation seeds are drawn like in evaluate(), one per chunk
+        instead of one per individuum. Genomes are passed as stored,
+        together with their scales if they are int8.
+
+        :return: pop.fitness
+        """
+        seed = None
+        if common_random_numbers or self.seed is not None:
+            seed = self.rng.randrange(2**32)
+        for chunk in pop.chunks(chunk_size):
+            if seed is not None and not common_random_numbers:
+                seed = self.rng.randrange(2**32)
+            pop.fitness[chunk] = self.individuum.get_genomes_fitness(
+                pop.genomes[chunk],
+                seed=seed,
+                common_random_numbers=common_random_numbers,
+                scales=None if pop.scales is None else pop.scales[chunk],
+            )
+        return pop.fitness
+
+    def evaluate(
+        self, pop, common_random_numbers=False, evaluator=None, fitness_cache=None
+    ):
+        """
+        Evaluate the fitness of all individuums.
+
+        With an evaluator, the genomes of the population (see
+        population_genomes of the individuum class) are evaluated in
+        chunks, with one seed per chunk drawn like in evaluate_store().
+        Otherwise uses get_population_fitness of the individuum class if it
+        evaluates the whole population at once, and get_fitness of
+        each individuum otherwise.
+
+        If Evolution is seeded or common_random_numbers is set,
+        evaluation seeds are drawn from self.rng, either one per
+        individuum or one shared by the whole generation.
+
+        :pop: list of population
+        :common_random_numbers: Evaluate all individuums with the same seed
+        :evaluator: Evaluator of evaluators.py, or None
+        :fitness_cache: FitnessCache of fitness_cache.py, or None,
+        not with an evaluator that ranks the whole population, e.g.
+        a RacingEvaluator
+        :return: list of populations fitness
+        """
+        if fitness_cache is not None and not getattr(evaluator, "independent", True):
+            raise ValueError(
+                "Expect an evaluator that scores genomes independently "
+                "with fitness_cache"
+            )
+        seed = None
+        if common_random_numbers or self.seed is not None:
+            seed = self.rng.randrange(2**32)
+        if fitness_cache is not None:
+            return self.evaluate_cached(
+                pop, seed, common_random_numbers, evaluator, fitness_cache
+            )
+        return self.evaluate_seeded(pop, seed, common_random_numbers, evaluator)
+
+    def evaluate_cached(self, pop, seed, common_random_numbers, evaluator, cache):
+        """
+        Evaluate only the individuums whose genomes (see
+        population_genomes of the individuum class) are not in the
+        FitnessCache, each distinct genome once.
+        """
+        cache.new_generation()
+        shared_seed = seed if common_random_numbers else None
+        keys = [cache.key(genome) for genome in self.individuum.population_genomes(pop)]
+        fit = [cache.get(key, shared_seed) for key in keys]
+
+        # First individuum of each genome that is evaluated
+        missing = {}
+        for i, (key, value) in enumerate(zip(keys, fit)):
+            if value is None and key not in missing:
+                missing[key] = i
+        if not missing:
+            return fit
+        new_fit = self.evaluate_seeded(
+            [pop[i] for i in missing.values()], seed, common_random_numbers, evaluator
+        )
+        new_fit = {
+            key: cache.put(key, float(value), shared_seed)
+            for key, value in zip(missing, new_fit)
+        }
+        return [
+            new_fit[key] if value is None else value for key, value in zip(keys, fit)
+        ]
+
+    def evaluate_seeded(self, pop, seed, common_random_numbers, evaluator):
+        """
+        Evaluate all individuums, see evaluate().
+
+        :seed: Seed drawn for the generation, or None
+        """
+        if evaluator is not None:
+            seeds = []
+            for _ in evaluator.chunks(len(pop)):
+                if seed is not None and not common_random_numbers:
+                    seed = self.rng.randrange(2**32)
+                seeds.append(seed)
+            genomes = self.individuum.population_genomes(pop)
+            return evaluator.evaluate(
+                self.individuum, genomes, seeds, common_random_numbers
+            ).tolist()
+        fit = self.individuum.get_population_fitness(
+            pop, seed=seed, common_random_numbers=common_random_numbers
+        )
+        if fit is not None:
+            return fit
+        if common_random_numbers:
+            return [call_accepted(ind.get_fitness, seed=seed) for ind in pop]
+        if self.seed is not None:
+            return [
+                call_accepted(ind.get_fitness, seed=self.rng.randrange(2**32))
+                for ind in pop
+            ]
+        return [ind.get_fitness() for ind in pop]
+
     def default_callback(self, pop, fit, gen):
         """
         Callback function.
@@ -145,14 +462,31 @@ class Evolution(object):
         which selects two individual with a certain probability based on
         its fitness value.
 
+        optimize() selects all parents of a generation at once with
+        select_parents(), and calls this function for each pair only
+        if it is overridden.
+
         .. note::
         You CAN override this function.
         """
         return [
-            select_one_roulette(population, fitness),
-            select_one_roulette(population, fitness),
+            select_one_roulette(population, fitness, self.rng),
+            select_one_roulette(population, fitness, self.rng),
         ]
 
+    def select_parents(self, fitness, n, rng):
+        """
+        Indices of n parents, consecutive indices form a pair.
+        Uses the selection passed to Evolution.
+
+        :fitness: Fitness values of the population
+        :rng: numpy Generator
+
+        .. note::
+        You CAN override this function.
+        """
+        return self.selection(np.asarray(fitness, dtype=np.float64), n, rng)
+
     def recombine(self, parents):
         """
         Recombination of parents produces offsprings.
@@ -160,7 +494,25 @@ class Evolution(object):
         .. note::
         You CAN override this function.
         """
-        return self.individuum.recombine(parents)
+        return call_accepted(self.individuum.recombine, parents, rng=self.np_rng)
+
+    def recombine_population(self, parent_lists):
+        """
+        Recombination of all parent lists of a generation, with
+        recombine_population of the individuum class. If recombine()
+        is overridden, it is called for each parents instead.
+
+        :parent_lists: List of parents, as passed to recombine()
+        :return: List of offspring lists, one per parents
+
+        .. note::
+        You CAN override this function.
+        """
+        if type(self).recombine is not Evolution.recombine:
+            return [self.recombine(parents) for parents in parent_lists]
+        return call_accepted(
+            self.individuum.recombine_population, parent_lists, rng=self.np_rng
+        )
 
     def mutate(self, individuum):
         """
@@ -169,7 +521,22 @@ class Evolution(object):
         .. note::
         You CAN override this function.
         """
-        individuum.mutate()
+        call_accepted(individuum.mutate, rng=self.np_rng)
+
+    def mutate_population(self, individuums):
+        """
+        Mutate all offsprings selected for mutation at once,
+        with mutate_population of the individuum class. If mutate()
+        is overridden, it is called for each offspring instead.
+
+        .. note::
+        You CAN override this function.
+        """
+        if type(self).mutate is not Evolution.mutate:
+            for individuum in individuums:
+                self.mutate(individuum)
+            return
+        call_accepted(self.individuum.mutate_population, individuums, rng=self.np_rng)
 
     @staticmethod
     def display(dict):
@@ -184,16 +551,100 @@ class Evolution(object):
         print("-" * 30)
 
 
-def select_one_roulette(population, fitness):
+def select_one_roulette(population, fitness, rng=random):
     """
     Individuum with higher fitness is selected more likely.
+    Prefer select_roulette() to select many individuums.
+
+    :rng: random.Random or the random module
     """
     if len(population) != len(fitness):
         raise ValueError("Size mismatch.")
-    total_fitness = sum(fitness)
-    pick = random.uniform(0, total_fitness)
+    weights = roulette_weights(fitness)
+    total_fitness = weights.sum()
+    if total_fitness <= 0:
+        return rng.choice(population)
+    pick = rng.uniform(0, total_fitness)
     current = 0
-    for fit, ind in zip(fitness, population):
-        current += fit
+    for weight, ind in zip(weights, population):
+        current += weight
         if current > pick:
             return ind
+    return population[-1]
+
+
+def roulette_weights(fitness):
+    """
+    Selection weights of fitness values. Negative fitness is
+    shifted such that the lowest fitness gets weight 0.
+    """
+    weights = np.asarray(fitness, dtype=np.float64)
+    lowest = weights.min()
+    if lowest < 0:
+        weights = weights - lowest
+    return weights
+
+
+def select_roulette(fitness, n, rng):
+    """
+    Indices of n individuums, selected with probability
+    proportional to their fitness (see roulette_weights()).
+    Uniform if all weights are zero.
+
+    :fitness: Array of fitness values
+    :rng: numpy Generator
+    """
+    cumulative = np.cumsum(roulette_weights(fitness))
+    if cumulative[-1] <= 0:
+        return rng.integers(0, len(cumulative), n)
+    pick = rng.random(n) * cumulative[-1]
+    return np.searchsorted(cumulative, pick, side="right")
+
+
+def select_sus(fitness, n, rng):
+    """
+    Stochastic universal sampling: like select_roulette(), but n
+    equally spaced pointers with one random offset, so each
+    individuum is selected close to its expected number of times.
+    The selection is shuffled, as pointers hit individuums in order.
+    """
+    cumulative = np.cumsum(roulette_weights(fitness))
+    if cumulative[-1] <= 0:
+        return rng.integers(0, len(cumulative), n)
+    step = cumulative[-1] / n
+    pick = (rng.random() + np.arange(n)) * step
+    index = np.searchsorted(cumulative, pick, side="right")
+    return rng.permutation(np.minimum(index, len(cumulative) - 1))
+
+
+def select_tournament(fitness, n, rng, size=2):
+    """
+    Each of the n individuums is the fittest of size individuums
+    drawn uniformly. Depends only on the order of the fitness.
+
+    :size: Number of individuums per tournament
+    """
+    fitness = np.asarray(fitness)
+    contestants = rng.integers(0, len(fitness), (n, size))
+    winner = fitness[contestants].argmax(axis=1)
+    return contestants[np.arange(n), winner]
+
+
+def select_rank(fitness, n, rng):
+    """
+    Roulette on ranks: the individuum with the k-th lowest fitness
+    is selected with probability proportional to k. Equal fitness
+    values share their mean rank.
+    """
+    _, inverse, counts = np.unique(fitness, return_inverse=True, return_counts=True)
+    ranks = np.cumsum(counts) - (counts - 1) / 2
+    return select_roulette(ranks[inverse], n, rng)
+
+
+# Parent selections of Evolution, functions (fitness, n, rng) -> indices
+SELECTIONS = {
+    "roulette": select_roulette,
+    "sus": select_sus,
+    "tournament": select_tournament,
+    "rank": select_rank,
+}
@@ -0,0 +1,142 @@
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+
+class FitnessCache(object):
+    """
+    Fitness of genomes that were evaluated before, keyed by a hash
+    of the genome, see Evolution.optimize(fitness_cache=...).
+
+    Elites and children taken over without crossover or mutation
+    are clones of genomes of the last generation, and are not
+    evaluated again.
+
+    Under common random numbers, all genomes of a generation are
+    scored on the same food spawns, so each entry keeps the score
+    per shared seed. A genome is a hit only if it was scored on
+    the seed of the current generation, and its fitness is that
+    score, never a mean over other seeds.
+
+    Genomes evaluated with own seeds are hits once they have
+    max_samples samples, their fitness is the mean of all samples
+    instead of a score from scratch.
+    """
+
+    def __init__(self, maxsize=100000, max_age=None, max_samples=1):
+        """
+        :maxsize: Maximum number of genomes, the least recently used
+        genome is dropped when it is exceeded
+        :max_age: Drop genomes that were not used for max_age
+        generations, if None only maxsize applies
+        :max_samples: Number of evaluations averaged per genome
+        evaluated without a shared seed
+        """
+        if maxsize <= 0 or max_samples <= 0:
+            raise ValueError("Expect maxsize and max_samples to be positive")
+        if max_age is not None and max_age < 0:
+            raise ValueError("Expect max_age to be non negative")
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self.max_samples = max_samples
+        self.table = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.table)
+
+    @staticmethod
+    def key(genome):
+        """
+        Hash of the content of a genome.
+        """
+        genome = np.ascontiguousarray(genome)
+        digest = hashlib.blake2b(genome.dtype.str.encode(), digest_size=16)
+        digest.update(genome.tobytes())
+        return digest.digest()
+
+    def get(self, key, seed=None):
+        """
+        Cached fitness for key, or None if the genome must be
+        evaluated (again).
+
+        :seed: Evaluation seed shared by all genomes of the
+        generation, None if genomes are evaluated with own seeds
+        """
+        entry = self.table.get(key)
+        fitness = None
+        if entry is not None:
+            if seed is not None:
+                fitness = entry.scores.get(seed)
+            elif entry.samples >= self.max_samples:
+                fitness = entry.fitness()
+        if fitness is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.use(key, entry)
+        return fitness
+
+    def put(self, key, fitness, seed=None):
+        """
+        Add an evaluation of the genome with key.
+
+        :seed: Shared evaluation seed the genome was scored on, see get()
+        :return: The score on seed, or without seed the mean fitness
+        of all evaluations without seed
+        """
+        entry = self.table.get(key)
+        if entry is None:
+            entry = self.table[key] = CacheEntry()
+        self.use(key, entry)
+        if len(self.table) > self.maxsize:
+            self.table.popitem(last=False)
+        if seed is not None:
+            entry.scores[seed] = fitness
+            return fitness
+        entry.total += fitness
+        entry.samples += 1
+        return entry.fitness()
+
+    def use(self, key, entry):
+        entry.generation = self.generation
+        self.table.move_to_end(key)
+
+    def new_generation(self):
+        """
+        Start a new generation and drop genomes older than max_age.
+        """
+        self.generation += 1
+        if self.max_age is None:
+            return
+        # Entries are ordered by last use, the oldest come first
+        while self.table:
+            key, entry = next(iter(self.table.items()))
+            if self.generation - entry.generation <= self.max_age:
+                break
+            del self.table[key]
+
+    def clear(self):
+        self.table.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class CacheEntry(object):
+    """
+    Sum and number of fitness evaluations of a genome without
+    seed, and its scores by shared seed.
+    """
+
+    __slots__ = ("total", "samples", "scores", "generation")
+
+    def __init__(self):
+        self.total = 0.0
+        self.samples = 0
+        self.scores = {}
+        self.generation = 0
+
+    def fitness(self):
+        return self.total / self.samples
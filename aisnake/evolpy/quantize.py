@@ -0,0 +1,60 @@
+import numpy as np
+
+# Data types in which genomes can be stored
+GENOME_DTYPES = ("float32", "float16", "int8")
+
+# int8 genes are scaled such that the largest absolute gene becomes INT8_MAX
+INT8_MAX = 127
+
+
+def quantize(genomes, dtype="int8", segments=None):
+    """
+    Convert float genomes to reduced precision.
+
+    int8 genomes get one scale per segment of columns, e.g. per
+    layer of a neural net, with gene = value * scale.
+
+    :genomes: Array of shape (number of genomes, genome size)
+    :dtype: One of GENOME_DTYPES
+    :segments: List of (start, stop) column ranges that share a scale,
+    if None, each genome has a single scale
+    :return: (values, scales), scales is a float32 array of shape
+    (number of genomes, number of segments) for int8 and None otherwise
+    """
+    if dtype not in GENOME_DTYPES:
+        raise ValueError("Expect dtype to be one of {}".format(GENOME_DTYPES))
+    if dtype != "int8":
+        return np.asarray(genomes, dtype=dtype), None
+
+    genomes = np.asarray(genomes, dtype=np.float32)
+    segments = genome_segments(genomes.shape[1], segments)
+    values = np.empty(genomes.shape, dtype=np.int8)
+    scales = np.empty((len(genomes), len(segments)), dtype=np.float32)
+    for i, (start, stop) in enumerate(segments):
+        part = genomes[:, start:stop]
+        scale = np.abs(part).max(axis=1) / INT8_MAX
+        scale[scale == 0] = 1.0
+        scales[:, i] = scale
+        values[:, start:stop] = np.rint(part / scale[:, None])
+    return values, scales
+
+
+def dequantize(values, scales=None, segments=None):
+    """
+    Convert genomes of quantize() back to float32.
+    """
+    if scales is None:
+        return np.asarray(values, dtype=np.float32)
+    genomes = np.array(values, dtype=np.float32)
+    for i, (start, stop) in enumerate(genome_segments(genomes.shape[1], segments)):
+        genomes[:, start:stop] *= scales[:, i, None]
+    return genomes
+
+
+def genome_segments(size, segments=None):
+    """
+    Segments of a genome of size, a single segment if None.
+    """
+    if segments is None:
+        return [(0, size)]
+    return [(int(start), int(stop)) for start, stop in segments]
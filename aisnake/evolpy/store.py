@@ -0,0 +1,136 @@
+import os
+import numpy as np
+from numpy.lib.format import open_memmap
+from .quantize import quantize, dequantize, genome_segments
+
+
+class PopulationStore(object):
+    """
+    Population kept on disk for Evolution.optimize_store().
+
+    Genomes are a memory mapped matrix of shape (population size,
+    genome size) and fitness a memory mapped float64 array of shape
+    (population size,), both as .npy files, so they can be opened
+    again with np.load(mmap_mode=...). Only the pages of the chunks
+    that are worked on are in memory.
+
+    Genomes can be stored as float16 or int8 (see quantize.py),
+    int8 genomes keep their scales per segment in a third file, and
+    the segment boundaries in a fourth.
+    read() and write() convert from and to float32.
+    """
+
+    def __init__(
+        self,
+        path,
+        population_size=None,
+        genome_size=None,
+        dtype="float32",
+        segments=None,
+    ):
+        """
+        Create a new store at path, or open an existing one if
+        population_size and genome_size are None.
+
+        :path: Path of the store, the files are path.genomes.npy,
+        path.fitness.npy and for int8 path.scales.npy and
+        path.segments.npy
+        :dtype: Data type of the genomes, one of GENOME_DTYPES
+        :segments: List of (start, stop) column ranges of the genome
+        that share an int8 scale, e.g. the layers of a neural net.
+        Stores that are opened again use the stored segments.
+        """
+        self.path = path
+        genomes_file, fitness_file = path + ".genomes.npy", path + ".fitness.npy"
+        scales_file, segments_file = path + ".scales.npy", path + ".segments.npy"
+        if population_size is None and genome_size is None:
+            if not os.path.isfile(genomes_file):
+                raise ValueError("File {} not found".format(genomes_file))
+            self.genomes = np.load(genomes_file, mmap_mode="r+")
+            self.fitness = np.load(fitness_file, mmap_mode="r+")
+            self.scales = None
+            if os.path.isfile(scales_file):
+                self.scales = np.load(scales_file, mmap_mode="r+")
+            self.dtype = self.genomes.dtype.name
+            self.segments = self.stored_segments(segments_file, segments)
+            return
+
+        self.dtype = dtype
+        self.segments = genome_segments(genome_size, segments)
+        # Validates dtype
+        _, scales = quantize(np.zeros((1, genome_size)), dtype, self.segments)
+        self.genomes = open_memmap(
+            genomes_file, mode="w+", dtype=dtype, shape=(population_size, genome_size)
+        )
+        self.fitness = open_memmap(
+            fitness_file, mode="w+", dtype=np.float64, shape=(population_size,)
+        )
+        self.scales = None
+        if scales is None:
+            # Files of an int8 store that was at path before
+            for name in (scales_file, segments_file):
+                if os.path.isfile(name):
+                    os.remove(name)
+        else:
+            self.scales = open_memmap(
+                scales_file,
+                mode="w+",
+                dtype=np.float32,
+                shape=(population_size, len(self.segments)),
+            )
+            np.save(segments_file, np.array(self.segments, dtype=np.int64))
+
+    def stored_segments(self, segments_file, segments=None):
+        """
+        Segments of an existing store, checked against segments.
+        """
+        genome_size = self.genomes.shape[1]
+        if os.path.isfile(segments_file):
+            stored = genome_segments(genome_size, np.load(segments_file))
+            if segments is None:
+                return stored
+            if genome_segments(genome_size, segments) != stored:
+                raise ValueError("Expect segments to match the stored segments")
+            return stored
+        if self.scales is not None and self.scales.shape[1] > 1 and segments is None:
+            raise ValueError(
+                "Expect segments for a store with {} scales per genome".format(
+                    self.scales.shape[1]
+                )
+            )
+        return genome_segments(genome_size, segments)
+
+    def __len__(self):
+        return len(self.genomes)
+
+    def chunks(self, chunk_size):
+        """
+        Slices of at most chunk_size individuums that cover the store.
+        """
+        for start in range(0, len(self), chunk_size):
+            yield slice(start, min(start + chunk_size, len(self)))
+
+    def read(self, index):
+        """
+        Genomes at index (slice or index array) as float32.
+        """
+        scales = None if self.scales is None else self.scales[index]
+        return dequantize(self.genomes[index], scales, self.segments)
+
+    def write(self, start, genomes):
+        """
+        Store float genomes from row start on.
+        """
+        values, scales = quantize(genomes, self.dtype, self.segments)
+        self.genomes[start : start + len(values)] = values
+        if scales is not None:
+            self.scales[start : start + len(values)] = scales
+
+    def flush(self):
+        """
+        Write changes to disk.
+        """
+        self.genomes.flush()
+        self.fitness.flush()
+        if self.scales is not None:
+            self.scales.flush()
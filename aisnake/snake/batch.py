@@ -0,0 +1,271 @@
+import numpy as np
+from .params import BORD_WIDTH, BORD_HEIGHT
+from .datatypes import Position, Direction, Turn, DIRECTION_VEC
+from .food import SPAWN_X_MIN, SPAWN_Y_MIN
+
+# Unit steps per Direction value [UP, RIGHT, DOWN, LEFT]
+DIR_DX = np.array([dx for dx, _ in DIRECTION_VEC], dtype=np.int64)
+DIR_DY = np.array([dy for _, dy in DIRECTION_VEC], dtype=np.int64)
+
+# Change of Direction value per Turn value [NO, LEFT, RIGHT]
+TURN_DELTA = np.array([0, -1, 1], dtype=np.int64)
+
+# Constants of the splitmix64 generator
+GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+class BatchGame(object):
+    """
+    N games of snake that are played in lockstep.
+
+    All games are kept in NumPy arrays and advanced with a single
+    call to step(). The rules are the same as for Game and AIGame:
+    the snake starts in the center looking up, food spawns
+    outside the snake and a game is over if the snake hits the
+    border, itself, or starves.
+
+    Fields are encoded as integer cells, cell = y * width + x.
+    The occupancy has one more column, self.wall, which is always 1
+    and stands for all fields outside the bord. The body of each
+    snake is stored in a ring buffer, where start points to the
+    tail and start + length - 1 to the head.
+
+    Every game draws its food spawns from its own random stream,
+    given by its seed and the number of spawns so far. Games with
+    the same seed therefore see the same random numbers, no matter
+    how many other games are played alongside. The stream is not
+    the random.Random of Game, so a seeded game spawns food on
+    other fields than a Game with the same seed, and scores differ.
+    Only the rules are the same, see tests/test_batch.py.
+    """
+
+    def __init__(
+        self,
+        n_games,
+        max_hunger=None,
+        auto_reset=True,
+        seed=None,
+        width=BORD_WIDTH,
+        height=BORD_HEIGHT,
+    ):
+        """
+        :n_games: Number of games that are played in parallel
+        :max_hunger: Steps a snake survives without eating, None disables hunger
+        :auto_reset: If True, finished games are reset at the end of step()
+        :seed: Either one seed per game, or a single seed (or None)
+        from which the seeds of all games are drawn
+        :width: Width of the bord
+        :height: Height of the bord
+        """
+        self.n_games = n_games
+        self.max_hunger = max_hunger
+        self.auto_reset = auto_reset
+        self.width = width
+        self.height = height
+        self.n_cells = width * height
+        self.capacity = self.n_cells + 1
+        self.wall = self.n_cells
+
+        # Food spawns at the same fields as in Food.spawn
+        xx, yy = np.meshgrid(np.arange(width), np.arange(height))
+        self.spawn_region = ((xx >= SPAWN_X_MIN) & (yy >= SPAWN_Y_MIN)).ravel()
+        self.start_cell = (height // 2) * width + width // 2
+
+        n = n_games
+        self.body = np.zeros((n, self.capacity), dtype=np.int64)
+        self.start = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.direction = np.zeros(n, dtype=np.int64)
+        self.occupancy = np.zeros((n, self.n_cells + 1), dtype=np.int16)
+        self.occupancy[:, self.wall] = 1
+        self.food = np.full(n, -1, dtype=np.int64)
+        self.hunger = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        # Games that ended by hitting a wall or the body in the last step
+        self.collided = np.zeros(n, dtype=bool)
+        self.seeds = game_seeds(seed, n)
+        self.spawns = np.zeros(n, dtype=np.uint64)
+        self.reset()
+
+    def reset(self, index=None, seed=None):
+        """
+        Reset snake and food of the selected games.
+
+        :index: Indices or boolean mask of games, None resets all
+        :seed: If given, reseed the selected games, either with one
+        seed per game or with a single seed from which they are drawn
+        """
+        if index is None:
+            index = np.arange(self.n_games)
+        index = np.asarray(index)
+        if index.dtype == bool:
+            index = np.flatnonzero(index)
+        if len(index) == 0:
+            return
+        if seed is not None:
+            self.seeds[index] = game_seeds(seed, len(index))
+            self.spawns[index] = 0
+        self.occupancy[index, : self.n_cells] = 0
+        self.start[index] = 0
+        self.length[index] = 1
+        self.body[index, 0] = self.start_cell
+        self.occupancy[index, self.start_cell] = 1
+        self.direction[index] = Direction.UP.value
+        self.hunger[index] = self.max_hunger if self.max_hunger is not None else 0
+        self.score[index] = 0
+        self.steps[index] = 0
+        self.done[index] = False
+        self._spawn_food(index)
+
+    def heads(self):
+        """
+        Return the head cell of all games.
+        """
+        head_slot = (self.start + self.length - 1) % self.capacity
+        return self.body[np.arange(self.n_games), head_slot]
+
+    def step(self, turns):
+        """
+        Play a single step in all games that are not done.
+
+        :turns: Array of Turn values (or Turn enums), one per game
+        :return: (eaten, done, score), boolean arrays whether the
+        snake has eaten or the game ended in this step, and the score
+        of each game. For finished games, score is the final score,
+        even when the game has already been reset.
+        """
+        if not isinstance(turns, np.ndarray):
+            turns = [t.value if isinstance(t, Turn) else t for t in turns]
+        turns = np.asarray(turns, dtype=np.int64)
+        if turns.shape != (self.n_games,):
+            raise ValueError("Expect one turn per game.")
+        active = ~self.done
+        games = np.arange(self.n_games)
+
+        # Turn
+        self.direction[active] = (
+            self.direction[active] + TURN_DELTA[turns[active]]
+        ) % 4
+
+        # Next field ahead
+        head = self.heads()
+        x = head % self.width + DIR_DX[self.direction]
+        y = head // self.width + DIR_DY[self.direction]
+        outside = (x < 0) | (x >= self.width) | (y < 0) | (y >= self.height)
+        next_cell = np.where(outside, 0, y * self.width + x)
+
+        # Grow or move
+        eaten = active & ~outside & (next_cell == self.food)
+        moving = np.flatnonzero(active & ~eaten)
+        tail = self.body[moving, self.start[moving]]
+        self.occupancy[moving, tail] -= 1
+        self.start[moving] = (self.start[moving] + 1) % self.capacity
+        self.length[eaten] += 1
+
+        inside = np.flatnonzero(active & ~outside)
+        head_slot = (self.start[inside] + self.length[inside] - 1) % self.capacity
+        self.body[inside, head_slot] = next_cell[inside]
+        self.occupancy[inside, next_cell[inside]] += 1
+
+        # Check collision
+        collision = outside | (self.occupancy[games, next_cell] > 1)
+
+        # Eat, spawn new food and update hunger
+        self.score[eaten] += 1
+        filled = np.zeros(self.n_games, dtype=bool)
+        eaten_index = np.flatnonzero(eaten)
+        filled[eaten_index] = ~self._spawn_food(eaten_index)
+        if self.max_hunger is not None:
+            self.hunger[eaten] = self.max_hunger
+            self.hunger[active & ~eaten] -= 1
+            starved = self.hunger == 0
+        else:
+            starved = np.zeros(self.n_games, dtype=bool)
+        self.steps[active] += 1
+
+        # Game over
+        done = active & (collision | starved | filled)
+        self.collided = active & collision
+        self.done |= done
+        score = self.score.copy()
+        if self.auto_reset:
+            self.reset(np.flatnonzero(done))
+        return eaten, done, score
+
+    def body_positions(self, game):
+        """
+        Return the body of a single game as list of Positions,
+        ordered from tail to head like Snake.body.
+
+        :game: Index of game
+        """
+        slots = (self.start[game] + np.arange(self.length[game])) % self.capacity
+        return [self.cell_to_position(c) for c in self.body[game, slots]]
+
+    def food_position(self, game):
+        """
+        Return the food of a single game as Position, or None if
+        no food is on the bord.
+
+        :game: Index of game
+        """
+        if self.food[game] < 0:
+            return None
+        return self.cell_to_position(self.food[game])
+
+    def cell_to_position(self, cell):
+        return Position(int(cell % self.width), int(cell // self.width))
+
+    def _spawn_food(self, index):
+        """
+        Spawn food outside the snake for the selected games.
+
+        Draws one random number per game and picks the
+        corresponding free field. If no field is left, food
+        is set to -1.
+
+        :index: Indices of games
+        :return: Boolean array, True where food could be placed
+        """
+        free = (self.occupancy[index, : self.n_cells] == 0) & self.spawn_region
+        n_free = free.sum(axis=1)
+        placed = n_free > 0
+        self.spawns[index] += np.uint64(1)
+        u = splitmix64(self.seeds[index] + self.spawns[index] * GOLDEN_GAMMA)
+        k = (u * n_free).astype(np.int64)
+        cell = (np.cumsum(free, axis=1) > k[:, None]).argmax(axis=1)
+        self.food[index] = np.where(placed, cell, -1)
+        return placed
+
+
+def game_seeds(seed, n_games):
+    """
+    Seeds of n_games games.
+
+    :seed: Array of one seed per game, or a single seed (or None)
+    from which the seeds are drawn
+    :return: uint64 array of shape (n_games,)
+    """
+    if seed is not None and np.ndim(seed) > 0:
+        seeds = np.asarray(seed, dtype=np.uint64)
+        if seeds.shape != (n_games,):
+            raise ValueError("Expect one seed per game.")
+        return seeds
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 2**63, size=n_games, dtype=np.uint64)
+
+
+def splitmix64(state):
+    """
+    Map uint64 generator states to uniform floats in [0, 1)
+    with the output function of splitmix64.
+    """
+    z = state
+    z = (z ^ (z >> np.uint64(30))) * MIX_1
+    z = (z ^ (z >> np.uint64(27))) * MIX_2
+    z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) * 2.0**-53
@@ -0,0 +1,136 @@
+from functools import lru_cache
+import numpy as np
+from .params import BORD_WIDTH, BORD_HEIGHT
+from .cells import GRID_PADDING, GRID_WIDTH, GRID_HEIGHT, GRID_SIZE
+from .cells import to_cell, vision_table
+from .food import FreeFields
+
+
+def _mask(cells):
+    mask = 0
+    for cell in cells:
+        mask |= 1 << cell
+    return mask
+
+
+# Bit masks over the padded grid, bit i belongs to cell i
+BORD_MASK = _mask(to_cell(x, y) for y in range(BORD_HEIGHT) for x in range(BORD_WIDTH))
+WALL_MASK = ((1 << GRID_SIZE) - 1) & ~BORD_MASK
+
+
+class BitBoard(object):
+    """
+    Bitboard backend of Snake.
+
+    The fields covered by the snake are stored as bits of a single
+    Python int over the padded grid (see cells.py), walls are a
+    constant mask. Collision and vision are bitwise operations, and
+    copying a board is copying one int.
+
+    A field is covered or not, fields that are covered twice, or
+    walls that are covered, are marked in a second int, self.hits.
+    """
+
+    def __init__(self):
+        self.bits = 0
+        self.hits = 0
+        # Fields not covered by the snake, where food can spawn
+        self.free_fields = FreeFields()
+
+    @property
+    def occupancy(self):
+        """
+        Fields covered by the snake, indexed by [y, x].
+        """
+        grid = unpack_bits(self.bits, GRID_SIZE).reshape(GRID_HEIGHT, GRID_WIDTH)
+        return grid[
+            GRID_PADDING : GRID_PADDING + BORD_HEIGHT,
+            GRID_PADDING : GRID_PADDING + BORD_WIDTH,
+        ]
+
+    def clear(self):
+        """
+        Remove the snake from the bord.
+        """
+        self.bits = 0
+        self.hits = 0
+        self.free_fields.fill()
+
+    def count(self, cell):
+        """
+        Number of body parts on a cell of the bord, at most 2.
+        """
+        return ((self.bits >> cell) & 1) + ((self.hits >> cell) & 1)
+
+    def add(self, cell):
+        """
+        Mark cell as covered by a body part.
+        """
+        bit = 1 << cell
+        if (self.bits | WALL_MASK) & bit:
+            self.hits |= bit
+        else:
+            self.bits |= bit
+            self.free_fields.discard(cell)
+
+    def remove(self, cell):
+        """
+        Remove a body part from cell. The field becomes free once
+        no other body part covers it.
+        """
+        bit = 1 << cell
+        if self.hits & bit:
+            self.hits &= ~bit
+        else:
+            self.bits &= ~bit
+            self.free_fields.add(cell)
+
+    def collides(self, head):
+        """
+        Whether the head hits a wall or another body part.
+        """
+        return bool((self.hits >> head) & 1)
+
+    def vision(self, head, direction_value, radius, out=None):
+        """
+        Whether the fields on the perimeters 1...radius around head
+        are blocked.
+
+        Cuts the (2 * radius + 1) rows around the head out of the
+        bitboard with shifts and masks, and picks the perimeter
+        fields from that window with a precomputed index table.
+        """
+        size = 2 * radius + 1
+        row_mask = (1 << size) - 1
+        blocked = (self.bits | WALL_MASK) >> (head - radius - radius * GRID_WIDTH)
+        window = 0
+        for row in range(size):
+            window |= ((blocked >> (row * GRID_WIDTH)) & row_mask) << (row * size)
+        bits = unpack_bits(window, size * size)
+        return np.greater(bits.take(window_index(radius)[direction_value]), 0, out=out)
+
+
+def unpack_bits(value, n_bits):
+    """
+    Unpack the lowest n_bits bits of an int into
+    an uint8 array, lowest bit first.
+    """
+    data = value.to_bytes((n_bits + 7) // 8, "little")
+    return np.unpackbits(
+        np.frombuffer(data, dtype=np.uint8), count=n_bits, bitorder="little"
+    )
+
+
+@lru_cache(maxsize=None)
+def window_index(radius: int):
+    """
+    Bit index of the fields of vision_table() in the vision
+    window of BitBoard.vision().
+
+    :return: Array of shape (4, number of fields), one row per Direction value
+    """
+    size = 2 * radius + 1
+    offsets = vision_table(radius)
+    table = (offsets[..., 1] + radius) * size + offsets[..., 0] + radius
+    table.setflags(write=False)
+    return table
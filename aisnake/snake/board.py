@@ -0,0 +1,93 @@
+from functools import lru_cache
+import numpy as np
+from .params import BORD_WIDTH, BORD_HEIGHT
+from .cells import GRID_PADDING, GRID_WIDTH, GRID_HEIGHT, GRID_SIZE, vision_table
+from .food import FreeFields
+
+
+class GridBoard(object):
+    """
+    Default backend of Snake, stores which fields are covered
+    by the snake in a flat NumPy array over the padded grid
+    (see cells.py).
+
+    Walls are 1, fields on the bord count the body parts on them.
+    """
+
+    def __init__(self):
+        self.grid = np.ones(GRID_SIZE, dtype=np.int16)
+        self.occupancy.fill(0)
+        # Fields not covered by the snake, where food can spawn
+        self.free_fields = FreeFields()
+
+    @property
+    def occupancy(self):
+        """
+        Number of body parts on each field of the bord, indexed by [y, x].
+        View into the bord part of the padded grid.
+        """
+        return self.grid.reshape(GRID_HEIGHT, GRID_WIDTH)[
+            GRID_PADDING : GRID_PADDING + BORD_HEIGHT,
+            GRID_PADDING : GRID_PADDING + BORD_WIDTH,
+        ]
+
+    def clear(self):
+        """
+        Remove the snake from the bord.
+        """
+        self.grid.fill(1)
+        self.occupancy.fill(0)
+        self.free_fields.fill()
+
+    def count(self, cell):
+        """
+        Number of body parts on a cell of the bord.
+        """
+        return self.grid[cell]
+
+    def add(self, cell):
+        """
+        Mark cell as covered by a body part.
+        Walls start at 1 and therefore never become free.
+        """
+        self.grid[cell] += 1
+        if self.grid[cell] == 1:
+            self.free_fields.discard(cell)
+
+    def remove(self, cell):
+        """
+        Remove a body part from cell. The field becomes free once
+        no other body part covers it.
+        """
+        self.grid[cell] -= 1
+        if self.grid[cell] == 0:
+            self.free_fields.add(cell)
+
+    def collides(self, head):
+        """
+        Whether the head hits a wall or another body part, i.e.
+        whether its field counts more than the head itself.
+        """
+        return self.grid[head] > 1
+
+    def vision(self, head, direction_value, radius, out=None):
+        """
+        Whether the fields on the perimeters 1...radius around head
+        are blocked. All fields are read with a single gather.
+        """
+        offsets = vision_offsets(radius)[direction_value]
+        return np.greater(self.grid.take(head + offsets), 0, out=out)
+
+
+@lru_cache(maxsize=None)
+def vision_offsets(radius: int):
+    """
+    Offsets in the flattened padded grid of the fields of
+    vision_table().
+
+    :return: Array of shape (4, number of fields), one row per Direction value
+    """
+    offsets = vision_table(radius)
+    table = offsets[..., 1] * GRID_WIDTH + offsets[..., 0]
+    table.setflags(write=False)
+    return table
@@ -0,0 +1,78 @@
+from functools import lru_cache
+import numpy as np
+from .params import BORD_WIDTH, BORD_HEIGHT
+from .datatypes import Position, Direction, DIRECTION_VEC, perimeter_offsets
+
+# The engine stores fields as integer cells of a grid that pads
+# the bord by GRID_PADDING fields of wall on each side, i.e.
+# cell = (y + GRID_PADDING) * GRID_WIDTH + x + GRID_PADDING.
+# Vision up to a radius of GRID_PADDING never leaves the grid.
+GRID_PADDING = 4
+GRID_WIDTH = BORD_WIDTH + 2 * GRID_PADDING
+GRID_HEIGHT = BORD_HEIGHT + 2 * GRID_PADDING
+GRID_SIZE = GRID_WIDTH * GRID_HEIGHT
+
+# Change of cell when moving one field, indexed by Direction value
+DIRECTION_STEP = tuple(dy * GRID_WIDTH + dx for dx, dy in DIRECTION_VEC)
+
+# Rotation (xx, xy, yx, yy) from bord to snake coordinates, indexed
+# by Direction value, such that the snake looks along the y-axis
+SNAKE_ROTATION = ((1, 0, 0, 1), (0, -1, 1, 0), (-1, 0, 0, -1), (0, 1, -1, 0))
+
+
+def to_cell(x: int, y: int) -> int:
+    """
+    Cell of bord coordinates x, y.
+    """
+    return (y + GRID_PADDING) * GRID_WIDTH + x + GRID_PADDING
+
+
+def to_position(cell: int) -> Position:
+    """
+    Position of a cell.
+    """
+    y, x = divmod(cell, GRID_WIDTH)
+    return Position(x - GRID_PADDING, y - GRID_PADDING)
+
+
+def on_bord(x: int, y: int) -> bool:
+    """
+    Whether bord coordinates x, y lay inside the bord.
+    """
+    return 0 <= x < BORD_WIDTH and 0 <= y < BORD_HEIGHT
+
+
+def relative_offset(cell: int, origin: int, direction_value: int) -> (int, int):
+    """
+    Offset (x, y) of cell from origin in the coordinate system of
+    a snake at origin looking along direction_value.
+    """
+    oy, ox = divmod(origin, GRID_WIDTH)
+    cy, cx = divmod(cell, GRID_WIDTH)
+    dx, dy = cx - ox, cy - oy
+    xx, xy, yx, yy = SNAKE_ROTATION[direction_value]
+    return xx * dx + xy * dy, yx * dx + yy * dy
+
+
+@lru_cache(maxsize=None)
+def vision_table(radius: int):
+    """
+    Offsets (dx, dy) of all fields on the perimeters 1...radius,
+    in the order of perimeter(). All backends derive the fields
+    they read for the vision from this table.
+
+    :return: Array of shape (4, number of fields, 2), one row per Direction value
+    """
+    table = np.array(
+        [
+            [
+                offset
+                for r in range(1, radius + 1)
+                for offset in perimeter_offsets(direction, r)
+            ]
+            for direction in Direction
+        ],
+        dtype=np.intp,
+    )
+    table.setflags(write=False)
+    return table
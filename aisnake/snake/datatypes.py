@@ -1,4 +1,5 @@
 from enum import Enum
+from functools import lru_cache
 
 
 class Turn(Enum):
@@ -7,6 +8,14 @@ class Turn(Enum):
     RIGHT = 2
 
 
+# Direction value after a right or left turn, indexed by Direction value
+TURN_RIGHT = (1, 2, 3, 0)
+TURN_LEFT = (3, 0, 1, 2)
+
+# Unit vector (x, y) of each Direction value
+DIRECTION_VEC = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+
 class Direction(Enum):
     UP = 0
     RIGHT = 1
@@ -18,28 +27,14 @@ class Direction(Enum):
         Return direction to the right of the
         current direction.
         """
-        if self is Direction.UP:
-            return Direction.RIGHT
-        elif self is Direction.RIGHT:
-            return Direction.DOWN
-        elif self is Direction.DOWN:
-            return Direction.LEFT
-        elif self is Direction.LEFT:
-            return Direction.UP
+        return DIRECTIONS[TURN_RIGHT[self.value]]
 
     def turn_left(self):
         """
         Return direction to the left of the
         current direction.
         """
-        if self is Direction.UP:
-            return Direction.LEFT
-        elif self is Direction.RIGHT:
-            return Direction.UP
-        elif self is Direction.DOWN:
-            return Direction.RIGHT
-        elif self is Direction.LEFT:
-            return Direction.DOWN
+        return DIRECTIONS[TURN_LEFT[self.value]]
 
     def to_vec(self):
         """
@@ -49,14 +44,7 @@ class Direction(Enum):
         down -> [0, -1]
         left -> [-1, 0]
         """
-        if self is Direction.UP:
-            return [0, 1]
-        elif self is Direction.RIGHT:
-            return [1, 0]
-        elif self is Direction.DOWN:
-            return [0, -1]
-        elif self is Direction.LEFT:
-            return [-1, 0]
+        return list(DIRECTION_VEC[self.value])
 
     def determine_turn(self, other):
         """
@@ -70,11 +58,17 @@ class Direction(Enum):
         return Turn.NO
 
 
+# Direction members, indexed by their value
+DIRECTIONS = tuple(Direction)
+
+
 class Position(object):
     """
     Position on Snake board.
     """
 
+    __slots__ = ("x", "y")
+
     def __init__(self, x: int, y: int):
         """
         :x: int, x-coordinate
@@ -107,14 +101,8 @@ class Position(object):
 
         TODO: Find better method name...
         """
-        if direction is Direction.UP:
-            return Position(position.x, position.y + distance)
-        elif direction is Direction.RIGHT:
-            return Position(position.x + distance, position.y)
-        elif direction is Direction.DOWN:
-            return Position(position.x, position.y - distance)
-        elif direction is Direction.LEFT:
-            return Position(position.x - distance, position.y)
+        dx, dy = DIRECTION_VEC[direction.value]
+        return Position(position.x + dx * distance, position.y + dy * distance)
 
     @staticmethod
     def distance(pos_a, pos_b):
@@ -138,6 +126,23 @@ def perimeter(position: Position, direction: Direction, radius: int):
     y < x
     x x x
     """
+    return [
+        Position(position.x + dx, position.y + dy)
+        for dx, dy in perimeter_offsets(direction, radius)
+    ]
+
+
+@lru_cache(maxsize=None)
+def perimeter_offsets(direction: Direction, radius: int):
+    """
+    Offsets [dx, dy] of all points that lay *radius* away
+    from a point, in the same order as perimeter().
+
+    Offsets only depend on direction and radius, so they
+    are computed once and cached.
+
+    :return: Tuple of (dx, dy) tuples
+    """
     if direction is Direction.UP:
         vec_st, step = [0, radius], [1, 0]
     elif direction is Direction.RIGHT:
@@ -148,12 +153,12 @@ def perimeter(position: Position, direction: Direction, radius: int):
         vec_st, step = [-radius, 0], [0, 1]
 
     # First
-    rv = [Position(position.x + vec_st[0], position.y + vec_st[1])]
+    rv = [tuple(vec_st)]
     vec = [vec_st[0] + step[0], vec_st[1] + step[1]]
     # Loop
     while vec != vec_st:
         # Append
-        rv.append(Position(position.x + vec[0], position.y + vec[1]))
+        rv.append(tuple(vec))
         # Check for corner
         if abs(vec[0]) == abs(vec[1]):
             # Turn 90 degree
@@ -162,4 +167,4 @@ def perimeter(position: Position, direction: Direction, radius: int):
         # Update vec
         vec[0], vec[1] = vec[0] + step[0], vec[1] + step[1]
 
-    return rv
+    return tuple(rv)
@@ -1,6 +1,10 @@
 import random
 from .params import BORD_WIDTH, BORD_HEIGHT
-from .datatypes import Position
+from .cells import GRID_SIZE, to_cell, to_position
+
+# Food spawns on fields with x >= SPAWN_X_MIN and y >= SPAWN_Y_MIN
+SPAWN_X_MIN = 1
+SPAWN_Y_MIN = 1
 
 
 class Food(object):
@@ -9,10 +13,29 @@ class Food(object):
 
     Currently we assume that there is only one piece
     of food on the bord.
+
+    The food is stored as grid cell (see cells.py),
+    pos converts it to a Position.
     """
 
-    def __init__(self, position=None):
-        self.pos = position
+    def __init__(self, position=None, rng=None):
+        """
+        :position: type Position
+        :rng: random.Random that decides where food spawns,
+        if None, the global random module is used
+        """
+        self.rng = rng
+        self.place_at(position)
+
+    @property
+    def pos(self):
+        if self.cell is None:
+            return None
+        return to_position(self.cell)
+
+    @pos.setter
+    def pos(self, position):
+        self.place_at(position)
 
     def place_at(self, position):
         """
@@ -20,36 +43,108 @@ class Food(object):
 
         :position: type Position
         """
-        self.pos = position
+        self.cell = None if position is None else to_cell(position.x, position.y)
 
     def remove(self):
         """
         Remove apple from bord.
         """
-        self.pos = None
+        self.cell = None
 
     def spawn(self, snake):
         """
         Spawn food at a random location.
 
-        If snake object is given, we try to spawn the food
-        outside the snake.
+        If snake object is given, the food is drawn from the
+        free fields of the snake, so it always spawns outside
+        the snake.
+
+        :return: False if the snake has filled the bord and no
+        food could be placed (pos is None then), True otherwise
         """
+        rng = random if self.rng is None else self.rng
         if snake is None:
-            self.pos = self._get_random_position_on_board()
+            self.cell = self._get_random_cell_on_board(rng)
         else:
-            # Try until an ampty spot has been found.
-            # TODO: Find a more efficient way.
-            spawn_attempts = 0
-            while spawn_attempts < 1000:
-                self.pos = self._get_random_position_on_board()
-                if self.pos not in snake:
-                    return
-                spawn_attempts += 1
-            raise ValueError("Food spawn attempts reached maximum limit!")
+            self.cell = snake.free_fields.sample(rng)
+        return self.cell is not None
 
     @staticmethod
-    def _get_random_position_on_board():
-        x_pos = random.randint(1, BORD_WIDTH - 1)
-        y_pos = random.randint(1, BORD_HEIGHT - 1)
-        return Position(x_pos, y_pos)
+    def _get_random_cell_on_board(rng=random):
+        x_pos = rng.randint(SPAWN_X_MIN, BORD_WIDTH - 1)
+        y_pos = rng.randint(SPAWN_Y_MIN, BORD_HEIGHT - 1)
+        return to_cell(x_pos, y_pos)
+
+
+# Marks of cells in FreeFields.index that are not in the set
+NOT_FREE = -1
+NOT_SPAWNABLE = -2
+
+
+class FreeFields(object):
+    """
+    Set of fields where food can spawn, i.e. fields in the spawn
+    region that are not covered by the snake.
+
+    Fields are stored as grid cells in a list, together with the
+    index of each cell in that list. Adding, removing and sampling
+    a field are therefore O(1).
+    """
+
+    def __init__(self):
+        self.cells = []
+        self.index = []
+        self.fill()
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return self.index[cell] >= 0
+
+    def fill(self):
+        """
+        Mark all fields of the spawn region as free.
+        """
+        self.cells = [
+            to_cell(x, y)
+            for y in range(SPAWN_Y_MIN, BORD_HEIGHT)
+            for x in range(SPAWN_X_MIN, BORD_WIDTH)
+        ]
+        self.index = [NOT_SPAWNABLE] * GRID_SIZE
+        for i, cell in enumerate(self.cells):
+            self.index[cell] = i
+
+    def add(self, cell):
+        """
+        Mark a cell as free. Cells outside the spawn
+        region are ignored.
+        """
+        if self.index[cell] == NOT_FREE:
+            self.index[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def discard(self, cell):
+        """
+        Mark a cell as occupied. Cells outside the spawn
+        region are ignored.
+        """
+        i = self.index[cell]
+        if i < 0:
+            return
+        # Move last cell into the gap
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[i] = last
+            self.index[last] = i
+        self.index[cell] = NOT_FREE
+
+    def sample(self, rng=random):
+        """
+        Return a random free cell, or None if no cell is free.
+
+        :rng: random.Random or the random module
+        """
+        if not self.cells:
+            return None
+        return self.cells[rng.randrange(len(self.cells))]
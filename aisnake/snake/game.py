@@ -1,9 +1,9 @@
-import pygame
 from .snake import Snake
 from .food import Food
 from .params import *
 from .camera import Camera
 import time
+import random
 from .datatypes import Turn, Direction
 import os
 
@@ -13,23 +13,38 @@ class Game(object):
     Snake game
     """
 
-    def __init__(self):
+    def __init__(self, seed=None):
+        """
+        :seed: Seed of the random generator owned by this game,
+        if None, the global random module is used
+        """
         self.camera = Camera()
         self.snake = Snake()
-        self.food = Food()
+        self.food = Food(rng=None if seed is None else random.Random(seed))
         self.food.spawn(self.snake)
         self.display = None
 
-    def reset(self):
+    def reset(self, seed=None):
         """
         Reset snake and food
+
+        :seed: If given, reseed the random generator of this game
         """
+        if seed is not None:
+            self.food.rng = random.Random(seed)
         self.snake.reset()
         self.food.spawn(self.snake)
 
     def score(self):
         return self.snake.size() - 1
 
+    def won(self):
+        """
+        The game is won if the snake has filled the bord
+        and no food could be spawned.
+        """
+        return self.food.cell is None
+
     def step(self, turn: Turn):
         """
         Play a single step.
@@ -42,17 +57,19 @@ class Game(object):
             self.snake.turn_left()
 
         # Grow or move
-        next_pos = self.snake.next_ahead()
-        if next_pos == self.food.pos:
-            self.snake.grow(next_pos)
+        next_cell = self.snake.next_ahead_cell()
+        if next_cell == self.food.cell:
+            self.snake.grow_cell(next_cell)
             self.food.spawn(self.snake)
         else:
-            self.snake.move(next_pos)
+            self.snake.move_cell(next_cell)
 
     def play_gui(self):
         """
         Play game in pygame gui
         """
+        import pygame
+        from .render import render_text, wait
 
         # Initialize
         pygame.init()
@@ -87,10 +104,10 @@ class Game(object):
             # Render
             self.render()
             # Check collision
-            game_over = self.collision()
+            game_over = self.collision() or self.won()
             clock.tick(GAME_FPS)
 
-        render_text("Game over.", self.display)
+        render_text("You win!" if self.won() else "Game over.", self.display)
         time.sleep(2)
         pygame.quit()
 
@@ -98,7 +115,7 @@ class Game(object):
         """
         Check for collision
         """
-        return self.collision_at(self.snake.head())
+        return self.snake.collision()
 
     def collision_at(self, pos):
         """
@@ -112,6 +129,8 @@ class Game(object):
         TODO: Find a better way to handle events.
         Current method is not accurate enough.
         """
+        import pygame
+
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_LEFT:
                 event_list.append(Direction.LEFT)
@@ -157,6 +176,9 @@ class Game(object):
             raise ValueError("Not implemented key input")
 
     def render(self):
+        import pygame
+        from .render import render_field, render_snake, render_food, render_score
+
         self.display.fill(COL_BORDER)
         render_field(self.display, self.camera)
         render_snake(self.snake, self.display, self.camera)
@@ -165,6 +187,8 @@ class Game(object):
         pygame.display.update()
 
     def save_screenshot(self, file_name):
+        import pygame
+
         model_folder_path = "./img"
         if not os.path.exists(model_folder_path):
             os.makedirs(model_folder_path)
@@ -174,11 +198,13 @@ class Game(object):
 
 def collision_snake(pos, snake):
     """
-    Detect collision of snake with itself
+    Detect collision of snake with itself, i.e. whether pos
+    is occupied by any body part except the head
     """
-    if pos in snake.body[:-1]:
-        return True
-    return False
+    count = snake.count_at(pos)
+    if pos == snake.head():
+        count -= 1
+    return count > 0
 
 
 def collision_border(pos):
@@ -188,69 +214,3 @@ def collision_border(pos):
     if pos.x >= BORD_WIDTH or pos.x < 0 or pos.y >= BORD_HEIGHT or pos.y < 0:
         return True
     return False
-
-
-def render_snake(snake, display, camera):
-    """
-    Render snake in pygame
-    """
-    # Head
-    render_pixel(snake.head(), display, camera, COL_SNAKE_HEAD)
-
-    # Body
-    for pos in snake.body[:-1]:
-        render_pixel(pos, display, camera, COL_SNAKE_BODY)
-
-
-def render_food(food, display, camera):
-    render_pixel(food.pos, display, camera, COL_FOOD)
-
-
-def render_field(display, camera, color=WHITE):
-    """
-    Render game field
-    """
-    zero_world = camera.bord_to_world(camera.bord_zero())
-    w = BORD_WIDTH * camera.size_pixel
-    h = BORD_HEIGHT * camera.size_pixel
-    rect = [zero_world.x, zero_world.y, w, h]
-    pygame.draw.rect(display, color, rect)
-
-
-def render_pixel(pos, display, camera, color, scale=0.9):
-    s = camera.size_pixel * scale
-    pos_world = camera.bord_to_world(pos)
-    rect = [pos_world.x, pos_world.y, s, s]
-    pygame.draw.rect(display, color, rect)
-
-
-def render_text(msg, display, dest=None, color=COL_MSG_GAMEOVER, update=True):
-    font = pygame.font.SysFont(None, 20)
-    text = font.render(msg, True, color)
-    if dest is None:
-        w, h = pygame.display.get_surface().get_size()
-        # Centers text
-        dest = text.get_rect(center=(w / 2, h / 2))
-    display.blit(text, dest=dest)
-    if update:
-        pygame.display.update()
-
-
-def render_score(score, display, camera, color=COL_MSG_SCORE):
-    # from .datatypes import Position
-    text = "Score: {:4}".format(str(score))
-    font_style = pygame.font.SysFont(None, 16)
-    text = font_style.render(text, True, color)
-    w, _ = pygame.display.get_surface().get_size()
-    dest = text.get_rect(center=(w / 2, camera.size_pixel / 2))
-    display.blit(text, dest)
-
-
-def wait():
-    while True:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.KEYDOWN:
-                return
@@ -0,0 +1,86 @@
+import sys
+import pygame
+from itertools import islice
+from .params import *
+
+
+def render_snake(snake, display, camera):
+    """
+    Render snake in pygame
+    """
+    # Head
+    render_pixel(snake.head(), display, camera, COL_SNAKE_HEAD)
+
+    # Body
+    for pos in islice(snake.body, snake.size() - 1):
+        render_pixel(pos, display, camera, COL_SNAKE_BODY)
+
+
+def render_food(food, display, camera):
+    if food.pos is None:
+        return
+    render_pixel(food.pos, display, camera, COL_FOOD)
+
+
+def render_field(display, camera, color=WHITE):
+    """
+    Render game field
+    """
+    zero_world = camera.bord_to_world(camera.bord_zero())
+    w = BORD_WIDTH * camera.size_pixel
+    h = BORD_HEIGHT * camera.size_pixel
+    rect = [zero_world.x, zero_world.y, w, h]
+    pygame.draw.rect(display, color, rect)
+
+
+def render_pixel(pos, display, camera, color, scale=0.9):
+    s = camera.size_pixel * scale
+    pos_world = camera.bord_to_world(pos)
+    rect = [pos_world.x, pos_world.y, s, s]
+    pygame.draw.rect(display, color, rect)
+
+
+def render_text(msg, display, dest=None, color=COL_MSG_GAMEOVER, update=True):
+    font = pygame.font.SysFont(None, 20)
+    text = font.render(msg, True, color)
+    if dest is None:
+        w, h = pygame.display.get_surface().get_size()
+        # Centers text
+        dest = text.get_rect(center=(w / 2, h / 2))
+    display.blit(text, dest=dest)
+    if update:
+        pygame.display.update()
+
+
+def render_score(score, display, camera, color=COL_MSG_SCORE):
+    # from .datatypes import Position
+    text = "Score: {:4}".format(str(score))
+    font_style = pygame.font.SysFont(None, 16)
+    text = font_style.render(text, True, color)
+    w, _ = pygame.display.get_surface().get_size()
+    dest = text.get_rect(center=(w / 2, camera.size_pixel / 2))
+    display.blit(text, dest)
+
+
+def wait():
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            if event.type == pygame.KEYDOWN:
+                return
+
+
+def render_pixel_alpha(pos, display, camera, color, scale=0.9):
+    s = camera.size_pixel * scale
+    pos_world = camera.bord_to_world(pos)
+    rect = [pos_world.x, pos_world.y, s, s]
+    draw_rect_alpha(display, color, rect)
+    # pygame.draw.rect(display, color, rect)
+
+
+def draw_rect_alpha(surface, color, rect):
+    shape_surf = pygame.Surface(pygame.Rect(rect).size, pygame.SRCALPHA, 32)
+    pygame.draw.rect(shape_surf, color, shape_surf.get_rect())
+    surface.blit(shape_surf, rect)
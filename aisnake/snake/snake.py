@@ -1,5 +1,13 @@
+from collections import deque
 from .params import BORD_WIDTH, BORD_HEIGHT
-from .datatypes import Position, Direction
+from .datatypes import Position, Direction, DIRECTIONS, TURN_LEFT, TURN_RIGHT
+from .cells import GRID_PADDING, DIRECTION_STEP
+from .cells import to_cell, to_position, on_bord, relative_offset
+from .board import GridBoard
+from .bitboard import BitBoard
+
+# Storage backends for the fields covered by the snake
+BACKENDS = {"grid": GridBoard, "bitboard": BitBoard}
 
 
 class Snake(object):
@@ -7,9 +15,10 @@ class Snake(object):
     Representation of the snake.
     """
 
-    def __init__(self, start_pos=None):
+    def __init__(self, start_pos=None, backend="grid"):
         """
         :start_pos: type Position
+        :backend: Storage of the covered fields, key of BACKENDS
         """
         # Determine starting position
         if start_pos is None:
@@ -22,28 +31,78 @@ class Snake(object):
         # Determine starting direction
         self.direction = Direction.UP
 
-        # Collect body in list
-        self.body = [start_pos]
+        # Collect body as grid cells in deque, tail first and head last
+        self.cells = deque()
+        # Fields covered by the body
+        self.board = BACKENDS[backend]()
+        self._add(to_cell(start_pos.x, start_pos.y))
 
     def __contains__(self, position):
         """
         Returns whether this snake is on s certain field
         """
-        return position in self.body
+        return self.count_at(position) > 0
 
     def reset(self):
         """
         Reset Snake
         """
-        start_pos = Position(BORD_WIDTH // 2, BORD_HEIGHT // 2)
-        self.body = [start_pos]
+        self.cells.clear()
+        self.board.clear()
+        self._add(to_cell(BORD_WIDTH // 2, BORD_HEIGHT // 2))
         self.direction = Direction.UP
 
+    @property
+    def body(self):
+        """
+        Positions of the body, tail first and head last.
+        """
+        return [to_position(cell) for cell in self.cells]
+
+    @property
+    def occupancy(self):
+        """
+        Number of body parts on each field of the bord, indexed by [y, x].
+        """
+        return self.board.occupancy
+
+    @property
+    def free_fields(self):
+        """
+        Fields not covered by the snake, where food can spawn.
+        """
+        return self.board.free_fields
+
+    def set_backend(self, backend):
+        """
+        Move the body to another storage backend.
+
+        :backend: Key of BACKENDS
+        """
+        self.board = BACKENDS[backend]()
+        for cell in self.cells:
+            self.board.add(cell)
+
+    def count_at(self, position):
+        """
+        Returns the number of body parts on a certain field.
+        Fields outside of the bord are never occupied.
+        """
+        if on_bord(position.x, position.y):
+            return self.board.count(to_cell(position.x, position.y))
+        return 0
+
+    def collision(self):
+        """
+        Whether the head hits the border or another body part.
+        """
+        return self.board.collides(self.cells[-1])
+
     def size(self):
         """
         Returns size of snake (includes head)
         """
-        return len(self.body)
+        return len(self.cells)
 
     def score(self):
         """
@@ -55,7 +114,7 @@ class Snake(object):
         """
         Return the position of the head.
         """
-        return self.body[-1]
+        return to_position(self.cells[-1])
 
     def grow(self, position):
         """
@@ -63,7 +122,7 @@ class Snake(object):
 
         :position: type Position
         """
-        self.body.append(position)
+        self._add(to_cell(position.x, position.y))
 
     def move(self, position):
         """
@@ -71,38 +130,90 @@ class Snake(object):
 
         :position: type Position
         """
-        self.body.pop(0)
-        self.body.append(position)
+        self._remove_tail()
+        self._add(to_cell(position.x, position.y))
+
+    def grow_cell(self, cell):
+        """
+        Same as grow(), but takes a grid cell.
+        """
+        self._add(cell)
+
+    def move_cell(self, cell):
+        """
+        Same as move(), but takes a grid cell.
+        """
+        self._remove_tail()
+        self._add(cell)
 
     def turn_right(self):
         """
         Updates directions after right turn
         """
-        self.direction = self.direction.turn_right()
+        self.direction = DIRECTIONS[TURN_RIGHT[self.direction.value]]
 
     def turn_left(self):
         """
         Updates directions after left turn
         """
-        self.direction = self.direction.turn_left()
+        self.direction = DIRECTIONS[TURN_LEFT[self.direction.value]]
 
     def next_ahead(self):
         """
         Return the next field Snake visits if going ahead
         """
-        return Position.from_point(self.head(), self.direction, 1)
+        return to_position(self.next_ahead_cell())
 
     def next_right(self):
         """
         Return the next field Snake visits if going to its right
         """
-        return Position.from_point(self.head(), self.direction.turn_right(), 1)
+        step = DIRECTION_STEP[TURN_RIGHT[self.direction.value]]
+        return to_position(self.cells[-1] + step)
 
     def next_left(self):
         """
         Return the next field Snake visits if going to its left
         """
-        return Position.from_point(self.head(), self.direction.turn_left(), 1)
+        step = DIRECTION_STEP[TURN_LEFT[self.direction.value]]
+        return to_position(self.cells[-1] + step)
+
+    def next_ahead_cell(self):
+        """
+        Return the grid cell Snake visits if going ahead
+        """
+        return self.cells[-1] + DIRECTION_STEP[self.direction.value]
+
+    def vision(self, radius, out=None):
+        """
+        Return for all fields on the perimeters 1...radius around
+        the head, in the order of perimeter(), whether they are
+        blocked by a wall or the snake.
+
+        The fields are read by the backend with precomputed offsets.
+
+        :radius: Vision radius, at most GRID_PADDING
+        :out: Optional boolean array to write the result into
+        :return: Boolean array
+        """
+        if radius > GRID_PADDING:
+            raise ValueError(
+                "Vision radius {} exceeds grid padding {}".format(radius, GRID_PADDING)
+            )
+        return self.board.vision(self.cells[-1], self.direction.value, radius, out)
+
+    def _add(self, cell):
+        """
+        Append cell to the head and mark it on the board.
+        """
+        self.cells.append(cell)
+        self.board.add(cell)
+
+    def _remove_tail(self):
+        """
+        Remove the tail and clear it from the board.
+        """
+        self.board.remove(self.cells.popleft())
 
 
 def transform_bord_to_snake(pos: Position, snake: Snake) -> Position:
@@ -112,13 +223,7 @@ def transform_bord_to_snake(pos: Position, snake: Snake) -> Position:
     where the head is at zero, with the y-axis along the
     its looking direction.
     """
-    head = snake.head()
-    direction = snake.direction
-    pos_new = Position(pos.x - head.x, pos.y - head.y)
-    if direction is Direction.RIGHT:
-        pos_new.x, pos_new.y = -pos_new.y, pos_new.x
-    elif direction is Direction.DOWN:
-        pos_new.x, pos_new.y = -pos_new.x, -pos_new.y
-    elif direction is Direction.LEFT:
-        pos_new.x, pos_new.y = pos_new.y, -pos_new.x
-    return pos_new
+    x, y = relative_offset(
+        to_cell(pos.x, pos.y), snake.cells[-1], snake.direction.value
+    )
+    return Position(x, y)
@@ -0,0 +1,103 @@
+import numpy as np
+from .snake.batch import BatchGame
+from .ai_state import BatchStateEncoder, ACTIONS
+from .ai_snake import VISION_RADIUS, MAX_HUNGER
+
+# Outcome of an episode, reported in infos["outcome"]
+RUNNING = 0
+COLLISION = 1
+STARVED = 2
+FILLED = 3
+
+
+class VecSnakeEnv(object):
+    """
+    Gym-style vectorized environment of N snake games.
+
+    All games are stepped in lockstep by a BatchGame, observations
+    use the same encoding as AIGame.get_state, and actions the
+    same order as the outputs of the AI model (see ACTIONS).
+    Finished episodes are reset automatically, the observation
+    returned for them is the first one of the new episode.
+
+    Example
+    >>>
+    env = VecSnakeEnv(1000, seed=0)
+    obs = env.reset()
+    actions = policy(obs).argmax(axis=1)
+    obs, rewards, dones, infos = env.step(actions)
+    >>>
+    """
+
+    def __init__(
+        self,
+        n_envs,
+        vision_radius=VISION_RADIUS,
+        max_hunger=MAX_HUNGER,
+        seed=None,
+        reward_food=1.0,
+        reward_death=-1.0,
+        reward_step=0.0,
+    ):
+        """
+        :n_envs: Number of games
+        :vision_radius: Vision radius of the snakes
+        :max_hunger: Steps a snake survives without eating
+        :seed: Seed from which the food spawns of all games are drawn
+        :reward_food: Reward for eating
+        :reward_death: Reward for hitting a wall, itself or starving
+        :reward_step: Reward for every step
+        """
+        self.n_envs = n_envs
+        self.game = BatchGame(
+            n_envs, max_hunger=max_hunger, auto_reset=False, seed=seed
+        )
+        self.encoder = BatchStateEncoder(vision_radius, self.game)
+        self.observation_size = self.encoder.size
+        self.n_actions = len(ACTIONS)
+        self.reward_food = reward_food
+        self.reward_death = reward_death
+        self.reward_step = reward_step
+        self._turns = np.array([turn.value for turn in ACTIONS], dtype=np.int64)
+
+    def reset(self, seed=None):
+        """
+        Reset all games.
+
+        :seed: If given, reseed the food spawns of all games
+        :return: Observations, float32 array of shape (n_envs, observation_size)
+        """
+        self.game.reset(seed=seed)
+        return self.encoder.encode(self.game)
+
+    def step(self, actions):
+        """
+        Play one step in all games.
+
+        :actions: Integer array of shape (n_envs,), index into ACTIONS
+        :return: (observations, rewards, dones, infos)
+        observations: float32 array of shape (n_envs, observation_size),
+        the buffer is overwritten by the next call
+        rewards: float32 array of shape (n_envs,)
+        dones: bool array of shape (n_envs,)
+        infos: dict of arrays of shape (n_envs,), "score", "steps" and
+        "outcome" of the episode; only meaningful where dones is True
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        game = self.game
+        eaten, dones, score = game.step(self._turns[actions])
+
+        # A collision on the step where hunger runs out is a collision
+        outcome = np.full(self.n_envs, RUNNING, dtype=np.int8)
+        filled = dones & (game.food < 0)
+        outcome[dones] = STARVED
+        outcome[filled] = FILLED
+        outcome[game.collided] = COLLISION
+
+        rewards = np.full(self.n_envs, self.reward_step, dtype=np.float32)
+        rewards[eaten] += self.reward_food
+        rewards[dones & ~filled] += self.reward_death
+        infos = {"score": score, "steps": game.steps.copy(), "outcome": outcome}
+
+        game.reset(dones)
+        return self.encoder.encode(game), rewards, dones, infos
@@ -2,8 +2,8 @@
 from aisnake.ai_game import AIGame
 from aisnake.ai_snake import AISnake
 from aisnake.evolpy.evolution import Evolution
-import matplotlib.pyplot as plt
 import numpy as np
+import os
 
 # Save Neural net of best model at Gen X
 SAVE_GEN = [0, 10, 20, 50, 100, 150, 200, 250, 260, 270, 280, 290, 300]
@@ -46,6 +46,8 @@ def my_callback(pop, fit, gen):
         game = AIGame(best_model)
         game.play_ai(visible=True)
         # Plot
+        import matplotlib.pyplot as plt
+
         x = [i for i in range(len(avg_fit_history))]
         plt.scatter(x, avg_fit_history)
         plt.scatter(x, max_fit_history)
@@ -60,23 +62,25 @@ def my_callback(pop, fit, gen):
         fname = "model_gen_{}_best.pth".format(str(len(avg_fit_history)).zfill(4))
         print("Save {}".format(fname))
         best_model.neural_net.save(file_name=fname)
-        for i, model in enumerate(pop):
-            fname = "model_gen_{}_{}.pth".format(
-                str(len(avg_fit_history)).zfill(4), str(i).zfill(4)
-            )
-            model.neural_net.save(file_name=fname)
+        fname = "population_gen_{}.pop".format(str(len(avg_fit_history)).zfill(4))
+        AISnake.save_population(pop, fit, len(avg_fit_history), fname)
         np.savetxt("fitness_avg", np.array(avg_fit_history))
         np.savetxt("fitness_max", np.array(max_fit_history))
     return
 
 
 # Start from old population that has been saved
-old_pop = []
-for i in range(1000):
-    snake_ai = AISnake.new_random()
-    fname = "model_gen_{}_{}.pth".format(str(250).zfill(4), str(i).zfill(4))
-    snake_ai.neural_net.load(file_name=fname)
-    old_pop.append(snake_ai)
+fname = "population_gen_{}.pop".format(str(250).zfill(4))
+if not os.path.isfile(os.path.join("./model", fname)):
+    # Convert a population saved as one .pth file per snake
+    old_pop = AISnake.load_checkpoints(
+        [
+            "model_gen_{}_{}.pth".format(str(250).zfill(4), str(i).zfill(4))
+            for i in range(1000)
+        ]
+    )
+    AISnake.save_population(old_pop, [float("nan")] * len(old_pop), 250, fname)
+old_pop, _, _ = AISnake.load_population(fname)
 avg_fit_history = list(np.loadtxt("fitness_avg"))
 max_fit_history = list(np.loadtxt("fitness_max"))
 
@@ -91,7 +95,7 @@ pop = evolution.optimize(
 )
 
 # Postprocess
-fit = [ind.get_fitness() for ind in pop]
+fit = AISnake.get_population_fitness(pop)
 max_index = fit.index(max(fit))
 best_snake = pop[max_index]
 
@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+from aisnake.ai_snake import AISnake
+
+
+def test_pth_checkpoints_convert_to_an_archive(tmp_path, monkeypatch):
+    pytest.importorskip("torch")
+    monkeypatch.chdir(tmp_path)
+    rng = np.random.default_rng(0)
+    pop = [AISnake.new_random(rng=rng) for _ in range(5)]
+    names = ["model_gen_0001_{}.pth".format(str(i).zfill(4)) for i in range(5)]
+    for snake, name in zip(pop, names):
+        snake.neural_net.save(file_name=name)
+
+    old_pop = AISnake.load_checkpoints(names)
+    AISnake.save_population(old_pop, [float("nan")] * 5, 1, "population.pop")
+    new_pop, fitness, generation = AISnake.load_population("population.pop")
+
+    assert generation == 1 and len(fitness) == 5
+    for snake, loaded in zip(pop, new_pop):
+        np.testing.assert_array_equal(loaded.neural_net.genome, snake.neural_net.genome)
@@ -0,0 +1,68 @@
+import random
+import numpy as np
+from aisnake.ai_snake import AISnake
+from aisnake.snake.batch import BatchGame
+from aisnake.snake.game import Game
+from aisnake.snake.datatypes import Turn, Position
+
+MAX_HUNGER = 100
+N_GAMES = 50
+
+
+def greedy_turn(game, rng):
+    """
+    Turn towards the food and away from walls and the body, with
+    some noise, so that snakes grow long and die in all ways.
+    """
+    best = None
+    for turn, direction in (
+        (Turn.NO, game.snake.direction),
+        (Turn.LEFT, game.snake.direction.turn_left()),
+        (Turn.RIGHT, game.snake.direction.turn_right()),
+    ):
+        ahead = Position.from_point(game.snake.head(), direction, 1)
+        cost = abs(ahead.x - game.food.pos.x) + abs(ahead.y - game.food.pos.y)
+        cost += 100 * game.collision_at(ahead) + 3 * rng.random()
+        if best is None or cost < best[0]:
+            best = (cost, turn)
+    return best[1]
+
+
+def test_batch_game_follows_the_rules_of_game():
+    """
+    BatchGame draws food from its own random stream, so its food
+    is copied into Game after every spawn, and both play the
+    same turns.
+    """
+    rng = random.Random(0)
+    for seed in range(N_GAMES):
+        batch = BatchGame(1, max_hunger=MAX_HUNGER, auto_reset=False, seed=seed)
+        game = Game()
+        game.food.pos = batch.food_position(0)
+        hunger = MAX_HUNGER
+        while True:
+            turn = greedy_turn(game, rng)
+            size = game.snake.size()
+            game.step(turn)
+            hunger = MAX_HUNGER if game.snake.size() > size else hunger - 1
+            eaten, done, score = batch.step([turn])
+            if eaten[0]:
+                game.food.pos = batch.food_position(0)
+
+            assert score[0] == game.score()
+            if game.collision():
+                assert done[0] and batch.collided[0]
+                break
+            assert game.snake.body == batch.body_positions(0)
+            if hunger == 0 or batch.food[0] < 0:
+                assert done[0] and not batch.collided[0]
+                break
+            assert not done[0]
+
+
+def test_get_fitness_matches_population_fitness():
+    rng = np.random.default_rng(0)
+    pop = [AISnake.new_random(rng=rng) for _ in range(10)]
+    fit = AISnake.get_population_fitness(pop, seed=7, common_random_numbers=True)
+    assert [snake.get_fitness(seed=7) for snake in pop] == fit
+    assert max(fit) > 0
@@ -0,0 +1,61 @@
+import random
+import numpy as np
+from aisnake.snake.game import Game
+from aisnake.ai_state import batch_vision_cells
+from aisnake.snake.board import vision_offsets
+from aisnake.snake.cells import to_cell, to_position, on_bord
+from aisnake.snake.datatypes import Direction, Turn
+from aisnake.snake.params import BORD_WIDTH, BORD_HEIGHT
+
+TURNS = (Turn.NO, Turn.LEFT, Turn.RIGHT)
+
+
+def test_grid_and_bitboard_play_the_same_games():
+    rng = random.Random(0)
+    grid, bits = Game(seed=1), Game(seed=1)
+    bits.snake.set_backend("bitboard")
+    for _ in range(3000):
+        turn = rng.choice(TURNS)
+        grid.step(turn)
+        bits.step(turn)
+        assert list(bits.snake.cells) == list(grid.snake.cells)
+        assert bits.food.cell == grid.food.cell
+        assert bits.snake.collision() == grid.snake.collision()
+        np.testing.assert_array_equal(bits.snake.vision(3), grid.snake.vision(3))
+        if grid.snake.collision() or grid.won():
+            grid.reset()
+            bits.reset()
+
+
+def test_bitboard_collides_checks_the_given_cell():
+    game = Game()
+    game.snake.set_backend("bitboard")
+    board, head = game.snake.board, game.snake.cells[-1]
+    board.add(head)
+    assert board.collides(head)
+    assert not board.collides(head + 1)
+    board.remove(head)
+    assert not board.collides(head)
+    assert board.count(head) == 1
+
+
+def test_batch_vision_reads_the_fields_of_the_grid_vision():
+    radius = 3
+    batch = batch_vision_cells(radius, BORD_WIDTH, BORD_HEIGHT)
+    offsets = vision_offsets(radius)
+    for x, y in ((0, 0), (3, 7), (BORD_WIDTH - 1, BORD_HEIGHT // 2)):
+        for direction in Direction:
+            fields = [
+                to_position(to_cell(x, y) + offset)
+                for offset in offsets[direction.value]
+            ]
+            expected = [
+                (
+                    f.y * BORD_WIDTH + f.x
+                    if on_bord(f.x, f.y)
+                    else BORD_WIDTH * BORD_HEIGHT
+                )
+                for f in fields
+            ]
+            cells = batch[y * BORD_WIDTH + x, direction.value]
+            assert cells.tolist() == expected
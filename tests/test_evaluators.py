@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from aisnake.ai_snake import AISnake
+from aisnake.evolpy.evaluators import (
+    ProcessEvaluator,
+    RacingEvaluator,
+    SerialEvaluator,
+    SharedMemoryEvaluator,
+    ThreadEvaluator,
+)
+from aisnake.evolpy.evolution import Evolution
+from aisnake.evolpy.fitness_cache import FitnessCache
+
+
+def population(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [AISnake.new_random(rng=rng) for _ in range(n)]
+
+
+def test_racing_rejects_fitness_cache():
+    with pytest.raises(ValueError):
+        Evolution(AISnake, seed=0).evaluate(
+            population(10), False, RacingEvaluator(), FitnessCache()
+        )
+
+
+@pytest.mark.parametrize("common_random_numbers", [False, True])
+def test_evaluators_give_the_same_fitness(common_random_numbers):
+    pop = population(30)
+    evaluators = [
+        SerialEvaluator(chunk_size=8),
+        ThreadEvaluator(2, chunk_size=8),
+        ProcessEvaluator(2, chunk_size=8),
+        SharedMemoryEvaluator(2, chunk_size=8),
+    ]
+    fitness = []
+    for evaluator in evaluators:
+        with evaluator:
+            fitness.append(
+                Evolution(AISnake, seed=3).evaluate(
+                    pop, common_random_numbers, evaluator
+                )
+            )
+    assert max(fitness[0]) > 0
+    for other in fitness[1:]:
+        assert other == fitness[0]
+
+
+@pytest.mark.parametrize("budget", [100, 250, 600])
+def test_racing_spends_at_most_its_budget(budget):
+    evaluator = RacingEvaluator(budget=budget, initial_runs=2, round_runs=2)
+    fitness = Evolution(AISnake, seed=0).evaluate(population(50), False, evaluator)
+    assert len(fitness) == 50
+    assert 100 <= evaluator.games <= budget
+
+
+def test_racing_rejects_a_budget_below_the_initial_runs():
+    with pytest.raises(ValueError):
+        Evolution(AISnake, seed=0).evaluate(
+            population(50), False, RacingEvaluator(budget=99)
+        )
@@ -0,0 +1,52 @@
+import numpy as np
+from aisnake.ai_snake import AISnake
+from aisnake.evolpy.evolution import Evolution
+from aisnake.evolpy.fitness_cache import FitnessCache
+
+SEED = 12345
+
+
+def population(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [AISnake.new_random(rng=rng) for _ in range(n)]
+
+
+def test_unchanged_population_is_not_evaluated_again():
+    evolution, cache, pop = Evolution(AISnake, seed=0), FitnessCache(), population(20)
+    first = evolution.evaluate_cached(pop, SEED, True, None, cache)
+    assert (cache.hits, cache.misses) == (0, 20)
+
+    second = evolution.evaluate_cached(pop, SEED, True, None, cache)
+    assert (cache.hits, cache.misses) == (20, 20)
+    assert second == first
+
+
+def test_cached_scores_match_scores_on_the_same_seed():
+    evolution, cache = Evolution(AISnake, seed=0), FitnessCache()
+    elites, children = population(5, seed=1), population(15, seed=2)
+    evolution.evaluate_cached(elites, SEED, True, None, cache)
+
+    pop = elites + children
+    cached = evolution.evaluate_cached(pop, SEED, True, None, cache)
+    assert cache.hits == 5
+    assert cached == evolution.evaluate_seeded(pop, SEED, True, None)
+
+
+def test_shared_seeds_are_never_averaged():
+    cache = FitnessCache()
+    key = cache.key(np.ones(3))
+    cache.put(key, 5.0, seed=111)
+    cache.new_generation()
+    assert cache.get(key, 222) is None
+    assert cache.put(key, 3.0, seed=222) == 3.0
+    assert cache.get(key, 111) == 5.0
+    assert cache.get(key, 222) == 3.0
+
+
+def test_samples_without_seed_are_averaged():
+    cache = FitnessCache(max_samples=2)
+    key = cache.key(np.ones(3))
+    assert cache.put(key, 4.0) == 4.0
+    assert cache.get(key) is None
+    assert cache.put(key, 2.0) == 3.0
+    assert cache.get(key) == 3.0
@@ -0,0 +1,52 @@
+import json
+import os
+import subprocess
+import sys
+
+# Modules that headless evaluation imports
+HEADLESS_MODULES = (
+    "aisnake.ai_game",
+    "aisnake.ai_snake",
+    "aisnake.vec_env",
+    "aisnake.evolpy.evolution",
+)
+
+# Modules that are loaded only for rendering, torch inference or plotting
+HEAVY_MODULES = ("torch", "pygame", "matplotlib")
+
+# Seconds the headless modules may take to import
+IMPORT_BUDGET = 1.0
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def import_headless():
+    script = SCRIPT.format(modules=HEADLESS_MODULES, heavy=HEAVY_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_headless_import_skips_heavy_modules():
+    assert import_headless()["loaded"] == []
+
+
+def test_headless_import_budget():
+    seconds = import_headless()["seconds"]
+    assert seconds < IMPORT_BUDGET, "Import took {:.2f}s".format(seconds)
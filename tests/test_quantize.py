@@ -0,0 +1,67 @@
+import numpy as np
+from aisnake.ai.nnet import layer_segments, population_net, random_genomes
+from aisnake.ai_snake import LAYER_SIZES
+from aisnake.evolpy.quantize import quantize, dequantize
+from aisnake.evolpy.store import PopulationStore
+from aisnake.vec_env import VecSnakeEnv
+
+N_NETS = 50
+
+
+def recorded_states(n_envs=100, n_steps=40, seed=0):
+    """
+    Observations of games played with random actions,
+    float32 array of shape (n_envs * n_steps, observation size).
+    """
+    rng = np.random.default_rng(seed)
+    env = VecSnakeEnv(n_envs, seed=seed)
+    states = [env.reset().copy()]
+    for _ in range(n_steps - 1):
+        obs, _, _, _ = env.step(rng.integers(0, env.n_actions, n_envs))
+        states.append(obs.copy())
+    return np.concatenate(states)
+
+
+def decisions(genomes, states, scales=None):
+    net = population_net(genomes, LAYER_SIZES, scales)
+    x = np.broadcast_to(states, (len(genomes),) + states.shape)
+    return net.act(x)
+
+
+def agreement(dtype):
+    genomes = random_genomes(N_NETS, LAYER_SIZES, rng=np.random.default_rng(1))
+    states = recorded_states()
+    values, scales = quantize(genomes, dtype, layer_segments(LAYER_SIZES))
+    quantized = decisions(values, states, scales)
+    dequantized = decisions(
+        dequantize(values, scales, layer_segments(LAYER_SIZES)), states
+    )
+    original = decisions(genomes, states)
+    return (quantized == dequantized).mean(), (quantized == original).mean()
+
+
+def test_float16_decisions_match_float32():
+    same_values, same_as_float32 = agreement("float16")
+    assert same_values == 1.0
+    assert same_as_float32 >= 0.995
+
+
+def test_int8_decisions_match_float32():
+    same_values, same_as_float32 = agreement("int8")
+    assert same_values >= 0.999
+    assert same_as_float32 >= 0.98
+
+
+def test_int8_store_reopens_with_its_segments(tmp_path):
+    genomes = random_genomes(N_NETS, LAYER_SIZES, rng=np.random.default_rng(2))
+    segments = layer_segments(LAYER_SIZES)
+    path = str(tmp_path / "pop")
+    store = PopulationStore(path, N_NETS, genomes.shape[1], "int8", segments)
+    store.write(0, genomes)
+    store.flush()
+    written = store.read(slice(None))
+    del store
+
+    reopened = PopulationStore(path)
+    assert reopened.segments == segments
+    np.testing.assert_array_equal(reopened.read(slice(None)), written)
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from aisnake.evolpy.evolution import SELECTIONS
+
+N = 4000
+
+
+def select(name, fitness, seed=0):
+    index = SELECTIONS[name](
+        np.asarray(fitness, dtype=np.float64), N, np.random.default_rng(seed)
+    )
+    assert index.shape == (N,)
+    assert index.min() >= 0 and index.max() < len(fitness)
+    return np.bincount(index, minlength=len(fitness)) / N
+
+
+@pytest.mark.parametrize("name", sorted(SELECTIONS))
+def test_zero_fitness_is_selected_uniformly(name):
+    share = select(name, np.zeros(5))
+    np.testing.assert_allclose(share, 0.2, atol=0.03)
+
+
+@pytest.mark.parametrize("name", ["roulette", "sus"])
+def test_negative_fitness_is_shifted(name):
+    share = select(name, [-3.0, -1.0, 1.0])
+    assert share[0] == 0
+    np.testing.assert_allclose(share[1:], [1 / 3, 2 / 3], atol=0.03)
+
+
+@pytest.mark.parametrize("name", ["roulette", "sus"])
+def test_only_positive_weights_are_selected(name):
+    share = select(name, [0.0, 2.0, 0.0])
+    np.testing.assert_array_equal(share, [0, 1, 0])
+
+
+@pytest.mark.parametrize("name", ["tournament", "rank"])
+def test_order_based_selections_ignore_the_sign(name):
+    np.testing.assert_array_equal(
+        select(name, [-3.0, -1.0, 1.0]), select(name, [1.0, 3.0, 5.0])
+    )
+
+
+def test_rank_shares_ties():
+    share = select("rank", [1.0, 1.0, 5.0])
+    np.testing.assert_allclose(share, [1.5 / 6, 1.5 / 6, 3 / 6], atol=0.03)